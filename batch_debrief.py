@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Debriefs a whole archive of played games without the app, e.g.
+python batch_debrief.py games.csv debriefs.jsonl --processes 4
+
+Games are read from JSONL ({"id": ..., "answer": "cigar", "guesses": ["tares", "cigar"]})
+or CSV (with answer and guesses columns, the guesses separated by spaces, and
+optionally an id column). The id defaults to the game's line number.
+
+The output has one JSON line per guess, with the game's id, answer and
+guesses, the bits still missing before it, the expected information of the
+guess, the best alternative and its information, and the probability that the
+guess was the answer.
+
+Many games share their opening positions, so the archive is first read into
+a tree of positions, each with every guess played from it. A position is only
+analysed once, for all of those guesses, and the analyses are shared out
+between a process pool. Games are worked through in chunks, and each game's
+lines are written as soon as it is complete. Rerunning with the same output
+file appends to it, skipping the games already written, so an interrupted
+run carries on from where it stopped.
+"""
+
+from debrief import create_debrief_engine
+from wordle_solver import simulate_wordle_response
+from tqdm import tqdm
+import multiprocessing
+import argparse
+import json
+import csv
+import sys
+import os
+import re
+
+CHUNK_SIZE = 256 #Games analysed between writes to the output
+
+_worker_state = dict()
+
+
+def read_games(path):
+    """List of (id, answer, guesses) from a JSONL or CSV file."""
+    games = []
+    with open(path, newline='') as f:
+        if path.endswith('.jsonl') or path.endswith('.json'):
+            rows = ((line_number, json.loads(line)) for line_number, line in enumerate(f, 1) if line.strip() != '')
+        else:
+            rows = enumerate(csv.DictReader(f), 2)
+        for line_number, row in rows:
+            guesses = row.get('guesses', [])
+            if isinstance(guesses, str):
+                guesses = re.split(r'[\s,;]+', guesses.strip())
+            answer = str(row.get('answer', '')).strip().lower()
+            guesses = [str(guess).strip().lower() for guess in guesses if str(guess).strip() != '']
+            if (answer == '') or (len(guesses) == 0) or any(len(guess) != len(answer) for guess in guesses):
+                print("Skipping game on line", line_number, "of", path, file=sys.stderr)
+                continue
+            games.append((str(row.get('id', line_number)), answer, guesses))
+    return games
+
+def game_positions(answer, guesses):
+    """The history before each guess, as tuples of (guess, result)."""
+    history = []
+    positions = []
+    for guess in guesses:
+        positions.append(tuple(history))
+        history.append((guess, simulate_wordle_response(answer, guess)))
+    return positions
+
+def build_position_tree(games):
+    """Every guess played from each position in the archive."""
+    tree = dict()
+    for game_id, answer, guesses in games:
+        for position, guess in zip(game_positions(answer, guesses), guesses):
+            tree.setdefault(position, set()).add(guess)
+    return tree
+
+def completed_games(output_path):
+    """Keys (id, answer, guesses) of the games already fully written to the output.
+
+    Ids alone aren't enough, as they default to line numbers, which two
+    archives debriefed into the same output can share. Games are written whole, so only the last one can have been cut off part
+    way through. Its lines are removed, and everything before them is kept.
+    """
+    if not os.path.exists(output_path):
+        return set()
+    done = set()
+    read_bytes, complete_bytes = 0, 0
+    with open(output_path, 'rb') as f:
+        for line in f:
+            read_bytes += len(line)
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if not line.endswith(b'\n'):
+                break
+            if record['turn'] == record['turns']:
+                done.add(game_key(record['game'], record['answer'], record['guesses']))
+                complete_bytes = read_bytes
+    if complete_bytes < os.path.getsize(output_path):
+        with open(output_path, 'r+b') as f:
+            f.truncate(complete_bytes)
+    return done
+
+def game_key(game_id, answer, guesses):
+    return (game_id, answer, tuple(guesses))
+
+def init_worker(dict_file, word_length):
+    _worker_state['engine'] = create_debrief_engine(dict_file, word_length)
+
+def analyse(task):
+    """Analysis of one position, and of each guess played from it."""
+    position, guesses = task
+    engine = _worker_state['engine']
+    game = engine.solver.new_game()
+    for guess, result in position:
+        game.apply(guess, result)
+    analysis = engine.analyse_position(game)
+    summary = {'remaining': int(analysis['remaining']),
+               'bits_missing': float(analysis['entropy']),
+               'best_guess': str(analysis['best_guesses'][0]) if len(analysis['best_guesses']) > 0 else None,
+               'best_information': float(analysis['best_information'][0]) if len(analysis['best_guesses']) > 0 else None,
+               'guesses': dict()}
+    for guess in guesses:
+        summary['guesses'][guess] = (float(engine.guess_information(game, analysis, guess)), float(engine.guess_probability(game, guess)))
+    return position, summary
+
+def game_lines(game_id, answer, guesses, analyses):
+    lines = []
+    for turn, (position, guess) in enumerate(zip(game_positions(answer, guesses), guesses), 1):
+        summary = analyses[position]
+        information, probability = summary['guesses'][guess]
+        lines.append(json.dumps({'game': game_id,
+                                 'turn': turn,
+                                 'turns': len(guesses),
+                                 'answer': answer,
+                                 'guesses': guesses,
+                                 'guess': guess,
+                                 'result': simulate_wordle_response(answer, guess),
+                                 'remaining': summary['remaining'],
+                                 'bits_missing': summary['bits_missing'],
+                                 'guess_information': information,
+                                 'best_guess': summary['best_guess'],
+                                 'best_information': summary['best_information'],
+                                 'guess_probability': probability}) + '\n')
+    return lines
+
+def run_batch_debrief(games, output_path, dict_file, word_length, n_processes=1, progress=True):
+    """Debrief the games not already in the output, returning (games written, positions analysed)."""
+    done = completed_games(output_path)
+    todo = [game for game in games if game_key(*game) not in done]
+    tree = build_position_tree(todo)
+    analyses = dict()
+    n_written = 0
+
+    if n_processes > 1:
+        pool = multiprocessing.Pool(n_processes, initializer=init_worker, initargs=(dict_file, word_length))
+        analyse_all = lambda tasks: pool.imap_unordered(analyse, tasks)
+    else:
+        pool = None
+        init_worker(dict_file, word_length)
+        analyse_all = lambda tasks: map(analyse, tasks)
+
+    try:
+        with open(output_path, 'a') as f, tqdm(total=len(todo), disable=not progress) as bar:
+            for start in range(0, len(todo), CHUNK_SIZE):
+                chunk = todo[start:start + CHUNK_SIZE]
+                needed = {position for game_id, answer, guesses in chunk for position in game_positions(answer, guesses)}
+                tasks = [(position, sorted(tree[position])) for position in needed if position not in analyses]
+                tasks.sort(key=lambda task: len(task[0])) #Shortest histories (most remaining words) first keeps the pool busy
+                for position, summary in analyse_all(tasks):
+                    analyses[position] = summary
+                for game_id, answer, guesses in chunk:
+                    f.writelines(game_lines(game_id, answer, guesses, analyses))
+                    n_written += 1
+                f.flush()
+                bar.update(len(chunk))
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return n_written, len(analyses)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("games", help="CSV or JSONL file of played games")
+    parser.add_argument("output", help="JSONL file for the per guess analysis, appended to if it exists")
+    parser.add_argument("--dictionary", default="wordle_dictionary.txt")
+    parser.add_argument("--processes", type=int, default=int(os.environ.get('WORDLE_PROCESSES', 1)))
+    args = parser.parse_args()
+
+    games = read_games(args.games)
+    word_lengths = {len(answer) for game_id, answer, guesses in games}
+    if len(word_lengths) > 1:
+        sys.exit("All games in an archive should have the same word length")
+    n_written, n_positions = run_batch_debrief(games, args.output, args.dictionary, word_lengths.pop() if word_lengths else 5, n_processes=args.processes)
+    print("Debriefed", n_written, "games,", len(games) - n_written, "already done, analysing", n_positions, "distinct positions")
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Plays a strategy against every answer in a dictionary and reports how it did.
+
+All games are played at once by walking the strategy's decision tree: the
+guess for a position is chosen once, and the answers are split by the
+response they would give, so games that reach the same position share all of
+the work from there on. The subtrees below the first guess are shared out
+between a process pool.
+
+The results (guess count histogram, failure rate, time spent choosing
+guesses on each turn and overall throughput) are written to a JSON file, e.g.
+python benchmark.py wordle_dictionary.txt 5 --strategies entropy frequency --processes 4
+"""
+
+from wordle_solver import create_counts, get_suggestions
+from frequency_weights import load_frequency_weights
+from feedback_matrix import load_feedback_matrix
+from guess_scoring import score_rows, get_entropies, get_negative_expected_remaining, get_next_guess_success, get_response_weights, get_response_max_weights
+from tqdm import tqdm
+import numpy as np
+import instrumentation
+import multiprocessing
+import argparse
+import json
+import time
+import os
+
+MAX_TURNS = 6
+MAX_DEPTH = 20 #Stop following a game that gets this long
+
+_worker_state = dict()
+
+
+class BenchmarkContext:
+    """Word list, feedback matrix and prior weights shared by all games."""
+
+    def __init__(self, dict_file, word_length):
+        self.dict_file = dict_file
+        self.feedback = load_feedback_matrix(dict_file, word_length)
+        self.words = self.feedback.words
+        self.word_length = word_length
+        self.all_rows = np.arange(len(self.words))
+        self.uniform_weights = np.ones(len(self.words))
+        frequency_weights = load_frequency_weights(dict_file, word_length)
+        if frequency_weights is not None:
+            self.frequency_weights = np.array(frequency_weights, dtype=float)
+        else:
+            self.frequency_weights = self.uniform_weights
+        #Two or die treats the top 10th percentile of words as equally likely and the rest as impossible
+        self.top_decile_weights = (self.frequency_weights > np.percentile(self.frequency_weights, 90)).astype(float)
+
+
+def choose_by_score(context, candidates, weights, objective=get_entropies, reduction=get_response_weights):
+    if len(candidates) == 1:
+        return candidates[0]
+    scores = score_rows(context.all_rows, candidates, weights[candidates], context.word_length, context.feedback.matrix, progress=False, n_processes=1, objective=objective, reduction=reduction)
+    scores[candidates] += 0.0001 #Break ties in favour of words that could be right
+    return np.argmax(scores)
+
+def entropy_strategy(context, candidates):
+    return choose_by_score(context, candidates, context.uniform_weights)
+
+def frequency_strategy(context, candidates):
+    return choose_by_score(context, candidates, context.frequency_weights)
+
+def expected_remaining_strategy(context, candidates):
+    return choose_by_score(context, candidates, context.uniform_weights, get_negative_expected_remaining)
+
+def heuristic_strategy(context, candidates):
+    candidate_words = context.words[candidates]
+    green_counts, orange_counts = create_counts(candidate_words)
+    suggestions, info_scores = get_suggestions(candidate_words, green_counts, orange_counts)
+    return candidates[suggestions[0]]
+
+def two_or_die_strategy(context, candidates):
+    if len(candidates) == 1:
+        return candidates[0]
+    weights = context.top_decile_weights
+    if np.sum(weights[candidates]) == 0:
+        weights = context.uniform_weights
+    return choose_by_score(context, candidates, weights, get_next_guess_success, get_response_max_weights)
+
+STRATEGIES = {'entropy': entropy_strategy,
+              'frequency': frequency_strategy,
+              'heuristic': heuristic_strategy,
+              'two_or_die': two_or_die_strategy,
+              'expected_remaining': expected_remaining_strategy}
+
+
+def play(context, strategy, candidates, targets, turn, guess_counts, timings):
+    """Play every game in targets (a subset of candidates) from this position.
+
+    Records the number of guesses each target took (0 if it was never solved)
+    and adds the time spent choosing this guess to timings[turn].
+    """
+    start = time.perf_counter()
+    guess = strategy(context, candidates)
+    timings.setdefault(turn, [0, 0.0])
+    timings[turn][0] += 1
+    timings[turn][1] += time.perf_counter() - start
+
+    codes = context.feedback.matrix[guess][candidates]
+    target_codes = context.feedback.matrix[guess][targets]
+    solved = 3**context.word_length - 1
+    for code in np.unique(target_codes):
+        group_targets = targets[target_codes == code]
+        group = candidates[codes == code]
+        if code == solved:
+            guess_counts[int(group_targets[0])] = turn
+        elif (turn >= MAX_DEPTH) or (len(group) == len(candidates)): #No progress, so this game would never end
+            for t in group_targets:
+                guess_counts[int(t)] = 0
+        else:
+            play(context, strategy, group, group_targets, turn + 1, guess_counts, timings)
+    return guess, guess_counts, timings
+
+def init_worker(dict_file, word_length, strategy_name):
+    _worker_state['context'] = BenchmarkContext(dict_file, word_length)
+    _worker_state['strategy'] = STRATEGIES[strategy_name]
+
+def play_subtree(task):
+    candidates, targets = task
+    guess_counts, timings = dict(), dict()
+    play(_worker_state['context'], _worker_state['strategy'], candidates, targets, 2, guess_counts, timings)
+    return guess_counts, timings
+
+def run_benchmark(context, strategy_name, targets, n_processes=1, progress=True):
+    strategy = STRATEGIES[strategy_name]
+    start = time.perf_counter()
+    timings = {1: [1, 0.0]}
+    first_guess = strategy(context, context.all_rows)
+    timings[1][1] = time.perf_counter() - start
+
+    codes = context.feedback.matrix[first_guess]
+    guess_counts = dict()
+    tasks = []
+    for code in np.unique(codes[targets]):
+        group_targets = targets[codes[targets] == code]
+        if code == 3**context.word_length - 1:
+            guess_counts[int(group_targets[0])] = 1
+        else:
+            tasks.append((context.all_rows[codes == code], group_targets))
+    tasks.sort(key=lambda task: -len(task[0])) #Biggest subtrees first keeps the pool busy
+
+    def merge(subtree_results):
+        for subtree_counts, subtree_timings in (tqdm(subtree_results, total=len(tasks)) if progress else subtree_results):
+            guess_counts.update(subtree_counts)
+            for turn in subtree_timings:
+                timings.setdefault(turn, [0, 0.0])
+                timings[turn][0] += subtree_timings[turn][0]
+                timings[turn][1] += subtree_timings[turn][1]
+
+    if n_processes > 1:
+        with multiprocessing.Pool(n_processes, initializer=init_worker, initargs=(context.dict_file, context.word_length, strategy_name)) as pool:
+            merge(pool.imap_unordered(play_subtree, tasks))
+    else:
+        _worker_state['context'] = context
+        _worker_state['strategy'] = strategy
+        merge(map(play_subtree, tasks))
+    wall_time = time.perf_counter() - start
+
+    counts = np.array([guess_counts[int(t)] for t in targets])
+    failed = (counts == 0) | (counts > MAX_TURNS)
+    histogram = {str(n): int(np.sum(counts == n)) for n in np.unique(counts[counts > 0])}
+    solved_weights = context.frequency_weights[targets][counts > 0]
+    return {'strategy': strategy_name,
+            'first_guess': str(context.words[first_guess]),
+            'n_games': int(len(targets)),
+            'mean_guesses': float(np.mean(counts[counts > 0])),
+            'frequency_weighted_mean_guesses': float(np.sum(counts[counts > 0] * solved_weights) / np.sum(solved_weights)),
+            'histogram': histogram,
+            'unsolved': int(np.sum(counts == 0)),
+            'failure_rate': float(np.mean(failed)),
+            'wall_time': wall_time,
+            'games_per_second': len(targets) / wall_time,
+            'per_turn': [{'turn': int(turn), 'positions': timings[turn][0], 'seconds': timings[turn][1], 'mean_seconds': timings[turn][1] / timings[turn][0]} for turn in sorted(timings)]}
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dict_file")
+    parser.add_argument("word_length", type=int)
+    parser.add_argument("--strategies", nargs="+", default=["entropy"], choices=list(STRATEGIES))
+    parser.add_argument("--processes", type=int, default=int(os.environ.get('WORDLE_PROCESSES', 1)))
+    parser.add_argument("--answers", type=int, default=None, help="Only play this many answers, sampled at random")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--trace", default=None, metavar="FILE", help="Write counts and timings for each strategy (from this process) to FILE as JSON")
+    args = parser.parse_args()
+    if args.trace is not None:
+        instrumentation.enable(args.trace)
+
+    context = BenchmarkContext(args.dict_file, args.word_length)
+    targets = context.all_rows
+    if args.answers is not None:
+        targets = np.sort(np.random.default_rng(args.seed).choice(targets, min(args.answers, len(targets)), replace=False))
+
+    results = []
+    for strategy_name in args.strategies:
+        result = run_benchmark(context, strategy_name, targets, n_processes=args.processes)
+        print(strategy_name, "mean guesses:", result['mean_guesses'], "failure rate:", result['failure_rate'], "games per second:", result['games_per_second'])
+        results.append(result)
+        if instrumentation.enabled:
+            print(instrumentation.format_turn(instrumentation.end_turn(strategy_name)))
+
+    with open(args.output, "w") as f:
+        json.dump({'dict_file': args.dict_file, 'word_length': args.word_length, 'max_turns': MAX_TURNS, 'results': results}, f, indent=2)
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Filtering word lists with precomputed bitsets instead of simulating responses.
+
+A (guess, result) pair is turned into constraints on the answer: which
+letters are (or are not) at each position, and the minimum and maximum number
+of times each guessed letter appears. For a fixed word list we precompute, as
+packed bitsets over the words, which words have each letter at each position
+and which contain each letter at least k times. Applying a result is then a
+handful of ANDs over n/64 words.
+
+A word matches a result exactly when simulate_wordle_response would have
+produced that result for it, including the rule that the leftmost copies of
+a letter turn orange first: a result with an orange after a grey copy of the
+same letter can't happen, so nothing matches it.
+"""
+
+import numpy as np
+from feedback_matrix import words_to_codes
+
+ALPHABET_SIZE = 256 #Letters are indexed by their byte value
+
+
+def pack_bits(mask):
+    packed = np.packbits(mask, bitorder='little')
+    padded = np.zeros(-(-len(packed) // 8) * 8, dtype=np.uint8)
+    padded[0:len(packed)] = packed
+    return padded.view(np.uint64)
+
+def unpack_bits(bits, n_words):
+    return np.unpackbits(bits.view(np.uint8), count=n_words, bitorder='little').astype(bool)
+
+def get_constraints(guess, result):
+    """(greens, not_at, min_counts, max_counts) implied by a result, or None if no word could give it.
+
+    greens and not_at are lists of (position, letter), the counts are dicts
+    from letter to number of copies.
+    """
+    greens = []
+    not_at = []
+    min_counts = dict()
+    grey_letters = set()
+    for i in range(len(guess)):
+        letter = guess[i]
+        if result[i] == '*':
+            greens.append((i, letter))
+            min_counts[letter] = min_counts.get(letter, 0) + 1
+        else:
+            not_at.append((i, letter))
+            if result[i] == '.':
+                if letter in grey_letters: #Leftmost copies turn orange first
+                    return None
+                min_counts[letter] = min_counts.get(letter, 0) + 1
+            else:
+                grey_letters.add(letter)
+    max_counts = {letter: min_counts.get(letter, 0) for letter in grey_letters}
+    return greens, not_at, min_counts, max_counts
+
+
+class ConstraintIndex:
+    """Per position letter bitsets and letter count bitsets for a word list."""
+
+    def __init__(self, words):
+        self.words = words
+        self.n_words = len(words)
+        self.word_length = len(words[0]) if len(words) > 0 else 0
+        self.word_index = {words[i]: i for i in range(len(words))}
+        codes = words_to_codes(words)
+        n_blocks = -(-self.n_words // 64)
+        self.all_bits = pack_bits(np.ones(self.n_words, dtype=bool))
+        self.position_bits = np.zeros((self.word_length, ALPHABET_SIZE, n_blocks), dtype=np.uint64)
+        #count_bits[c, k] marks the words with at least k copies of letter c
+        self.count_bits = np.zeros((ALPHABET_SIZE, self.word_length + 2, n_blocks), dtype=np.uint64)
+        for p in range(self.word_length):
+            for c in np.unique(codes[:, p]):
+                self.position_bits[p, c] = pack_bits(codes[:, p] == c)
+        for c in np.unique(codes):
+            letter_counts = np.sum(codes == c, axis=1)
+            for k in range(1, self.word_length + 1):
+                self.count_bits[c, k] = pack_bits(letter_counts >= k)
+        self.count_bits[:, 0] = self.all_bits
+
+    def indices(self, word_list):
+        return np.array([self.word_index[w] for w in word_list], dtype=np.intp)
+
+    def match_bits(self, guess, result, bits=None, blocks=None):
+        """Packed bitset of the words (within bits, if given) consistent with the result.
+
+        If blocks (indices of 64 word blocks) is given, only those blocks are
+        matched, and bits and the result only cover those blocks.
+        """
+        select = slice(None) if blocks is None else blocks
+        bits = self.all_bits[select].copy() if bits is None else bits.copy()
+        constraints = get_constraints(guess, result)
+        if (constraints is None) or (len(guess) != self.word_length) or any(ord(letter) >= ALPHABET_SIZE for letter in guess):
+            return np.zeros_like(bits)
+        greens, not_at, min_counts, max_counts = constraints
+        for position, letter in greens:
+            bits &= self.position_bits[position, ord(letter), select]
+        for position, letter in not_at:
+            bits &= ~self.position_bits[position, ord(letter), select]
+        for letter in min_counts:
+            bits &= self.count_bits[ord(letter), min(min_counts[letter], self.word_length + 1), select]
+        for letter in max_counts:
+            if max_counts[letter] + 1 <= self.word_length:
+                bits &= ~self.count_bits[ord(letter), max_counts[letter] + 1, select]
+        return bits
+
+    def match_mask(self, guess, result):
+        return unpack_bits(self.match_bits(guess, result), self.n_words)
+
+    def hard_mode_bits(self, guess, result, bits=None):
+        """Packed bitset of the words (within bits, if given) that hard mode still allows as guesses.
+
+        Hard mode only makes greens stay where they are and revealed letters
+        be used again, so of the constraints this only applies the greens and
+        the minimum counts.
+        """
+        bits = self.all_bits.copy() if bits is None else bits.copy()
+        constraints = get_constraints(guess, result)
+        if (constraints is None) or (len(guess) != self.word_length) or any(ord(letter) >= ALPHABET_SIZE for letter in guess):
+            return np.zeros_like(bits)
+        greens, not_at, min_counts, max_counts = constraints
+        for position, letter in greens:
+            bits &= self.position_bits[position, ord(letter)]
+        for letter in min_counts:
+            bits &= self.count_bits[ord(letter), min(min_counts[letter], self.word_length + 1)]
+        return bits
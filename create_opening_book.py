@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Builds the opening book for a game, e.g.
+python create_opening_book.py wordle_dictionary.txt 5 --frequencies
+
+The book stores the full ranking of first guesses, then follows the best
+first guess and stores the top suggestions after every possible result.
+With --depth 3 it also follows the best second guess in each of those.
+"""
+
+from wordle_solver import Solver
+from feedback_matrix import decode_response
+from opening_book import save_opening_book
+from tqdm import tqdm
+import numpy as np
+import argparse
+
+
+def expand(solver, depth, nodes, n_stored):
+    words, scores = solver.suggest(None if len(solver.history) == 0 else n_stored, progress=len(solver.history) == 0)
+    nodes[tuple(solver.history)] = (words, scores)
+    if len(solver.history) + 1 >= depth:
+        return
+    guess = words[0]
+    feedback = solver.load_feedback()
+    responses = np.unique(feedback.responses(guess, solver.current_word_list))
+    for code in (tqdm(responses) if len(solver.history) == 0 else responses):
+        result = decode_response(code, feedback.word_length)
+        if result == '*' * feedback.word_length:
+            continue
+        child = solver.fork()
+        child.apply(guess, result)
+        expand(child, depth, nodes, n_stored)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dict_file")
+    parser.add_argument("word_length", type=int)
+    parser.add_argument("--frequencies", action="store_true", help="Weight words by their google books frequency")
+    parser.add_argument("--depth", type=int, default=2, help="Number of guesses covered by the book")
+    parser.add_argument("--stored", type=int, default=10, help="Suggestions stored for each position after the first")
+    args = parser.parse_args()
+
+    solver = Solver.from_dictionary(args.dict_file, args.word_length, args.frequencies, use_feedback_matrix=True)
+    solver.opening_book = None #Always score live when rebuilding the book
+    nodes = dict()
+    expand(solver, args.depth, nodes, args.stored)
+    save_opening_book(nodes, args.dict_file, args.word_length, args.frequencies, args.depth)
+    print("Stored", len(nodes), "positions")
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Backend for the debrief app: analysis of every guess in a finished game.
+
+For each position of the game the engine works out the remaining words, the
+missing information, the top guesses by expected information (from the
+opening book, or a pruned top-k search) and the most likely answers. Those
+only depend on the guesses and results so far, so they are kept in an LRU
+cache keyed on that history. Debriefs of different answers that pass
+through the same positions share the work, as do repeated debriefs.
+"""
+
+from wordle_solver import Solver, get_suggestions_brutish_force, simulate_wordle_response
+from collections import OrderedDict
+import numpy as np
+import instrumentation
+import threading
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+class DebriefEngine:
+
+    def __init__(self, solver, cache_size=DEFAULT_CACHE_SIZE, k=5):
+        self.solver = solver
+        self.cache_size = cache_size
+        self.k = k
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def cache_get(self, key):
+        with self.lock:
+            if key in self.cache:
+                instrumentation.count('debrief_cache_hits')
+                self.cache.move_to_end(key)
+                return self.cache[key]
+        instrumentation.count('debrief_cache_misses')
+        return None
+
+    def cache_put(self, key, value):
+        with self.lock:
+            self.cache[key] = value
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def analyse_position(self, game):
+        key = tuple(game.history)
+        analysis = self.cache_get(key)
+        if analysis is None:
+            best_guesses, best_information = game.suggest(self.k, progress=False)
+            likely_words, likely_probabilities = game.candidates(self.k)
+            analysis = {'remaining': len(game.candidate_indices),
+                        'entropy': game.entropy(),
+                        'best_guesses': best_guesses,
+                        'best_information': best_information,
+                        'likely_words': likely_words,
+                        'likely_probabilities': likely_probabilities}
+            self.cache_put(key, analysis)
+        return analysis
+
+    def guess_information(self, game, analysis, guess):
+        match = np.where(analysis['best_guesses'] == guess)[0]
+        if len(match) > 0:
+            return analysis['best_information'][match[0]]
+        feedback = game.load_feedback()
+        if (feedback is not None) and (guess not in feedback):
+            feedback = None
+        return get_suggestions_brutish_force(np.array([guess]), game.current_word_list, game.frequency_dict, feedback=feedback, progress=False)[1][0]
+
+    def guess_probability(self, game, guess):
+        is_guess = game.initial_word_list[game.candidate_indices] == guess
+        return np.sum(game.weights[game.candidate_indices][is_guess]) / np.sum(game.weights[game.candidate_indices])
+
+    def debrief(self, answer, guesses):
+        """A list with the analysis of the position before each guess, and of the guess itself."""
+        game = self.solver.new_game()
+        turns = []
+        for guess in guesses:
+            analysis = dict(self.analyse_position(game))
+            analysis['guess'] = guess
+            analysis['guess_information'] = self.guess_information(game, analysis, guess)
+            analysis['guess_probability'] = self.guess_probability(game, guess)
+            turns.append(analysis)
+            game.apply(guess, simulate_wordle_response(answer, guess))
+        return turns
+
+
+def create_debrief_engine(dict_file, word_length, cache_size=DEFAULT_CACHE_SIZE):
+    solver = Solver.from_dictionary(dict_file, word_length, use_word_frequencies=True, use_feedback_matrix=True)
+    return DebriefEngine(solver, cache_size=cache_size)
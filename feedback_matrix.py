@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Precomputed guess x answer feedback patterns.
+
+Every response string made of '-', '.' and '*' is encoded as a base 3 integer
+(position i contributes its digit times 3**i, with '-'=0, '.'=1, '*'=2).
+For each (dictionary file, word length) the full matrix of codes is computed
+once and cached next to the dictionary as a versioned .npy file, which is
+memory-mapped on later loads. The dictionary's content hash is part of the
+cache file name, so editing the dictionary invalidates the cache.
+
+Running this file builds the caches, e.g.
+python feedback_matrix.py wordle_dictionary.txt 5
+"""
+
+import numpy as np
+from wordle_dictionary import get_full_word_list, dictionary_fingerprint, remove_stale_files, temporary_path
+from tqdm import tqdm
+import instrumentation
+import glob
+import sys
+import os
+
+FORMAT_VERSION = 1
+
+RESPONSE_DIGITS = {'-': 0, '.': 1, '*': 2}
+RESPONSE_SYMBOLS = '-.*'
+
+
+def feedback_dtype(word_length):
+    #uint8 is enough for 5 letter wordle, longer words need wider codes
+    n_codes = 3**word_length
+    if n_codes <= 2**8:
+        return np.uint8
+    if n_codes <= 2**16:
+        return np.uint16
+    return np.uint32
+
+def encode_response(response):
+    code = 0
+    for i in range(len(response)):
+        code += RESPONSE_DIGITS[response[i]] * 3**i
+    return code
+
+def decode_response(code, word_length):
+    code = int(code)
+    response = []
+    for i in range(word_length):
+        response.append(RESPONSE_SYMBOLS[code % 3])
+        code = code // 3
+    return ''.join(response)
+
+def words_to_codes(word_list):
+    #All dictionaries (including nerdle) are ASCII, so each character becomes one byte
+    word_list = np.asarray(word_list, dtype=str)
+    if len(word_list) == 0:
+        return np.zeros((0, 0), dtype=np.uint8)
+    word_length = len(word_list[0])
+    as_bytes = word_list.astype('S' + str(word_length))
+    return np.frombuffer(as_bytes.tobytes(), dtype=np.uint8).reshape(len(word_list), -1)[:, 0:word_length]
+
+def compute_feedback(guess_codes, answer_codes):
+    """Vectorized equivalent of simulate_wordle_response(answer, guess) for every pair.
+
+    Takes letter code arrays from words_to_codes and returns the encoded
+    responses as an array of shape (n_guesses, n_answers).
+    """
+    word_length = guess_codes.shape[1]
+    #Relabel the symbols used here as 0, 1, 2, ... so per answer symbol counts stay small
+    #(10 digits and 5 operators for nerdle, at most 26 letters otherwise)
+    symbols, dense = np.unique(np.concatenate([guess_codes.ravel(), answer_codes.ravel()]), return_inverse=True)
+    guesses = dense[0:guess_codes.size].reshape(guess_codes.shape)
+    answers = dense[guess_codes.size:].reshape(answer_codes.shape)
+    symbol_counts = np.zeros((len(symbols), len(answers)), dtype=np.int8)
+    for k in range(word_length):
+        symbol_counts[answers[:, k], np.arange(len(answers))] += 1
+    green = [guesses[:, None, i] == answers[None, :, i] for i in range(word_length)]
+    codes = np.zeros((len(guesses), len(answers)), dtype=np.uint32)
+    for i in range(word_length):
+        #Non-green copies of this letter in the answer, less those already used up by
+        #earlier non-green copies in the guess (leftmost letter turns orange). That is the
+        #answer's count of the letter, less the earlier copies in the guess, less the greens
+        #from this position on, since a green copy always matches the same letter of the guess.
+        available = symbol_counts[guesses[:, i]]
+        available -= np.sum(guesses[:, 0:i] == guesses[:, i:i+1], axis=1, dtype=np.int8)[:, None]
+        available -= green[i]
+        for k in range(i + 1, word_length):
+            same = guesses[:, k] == guesses[:, i]
+            if np.any(same):
+                available -= green[k] & same[:, None]
+        orange = ~green[i] & (available > 0)
+        codes += (2 * green[i] + orange).astype(np.uint32) * 3**i
+    return codes.astype(feedback_dtype(word_length))
+
+def fill_feedback_matrix(out, guess_codes, answer_codes, batch_size=256):
+    for start in tqdm(range(0, len(guess_codes), batch_size)):
+        out[start:start+batch_size] = compute_feedback(guess_codes[start:start+batch_size], answer_codes)
+    return out
+
+
+class FeedbackMatrix:
+    """Feedback codes for every (guess, answer) pair of a sorted word list."""
+
+    def __init__(self, words, matrix, path=None):
+        self.words = words
+        self.matrix = matrix
+        self.path = path
+        self.word_length = len(words[0]) if len(words) > 0 else 0
+        self.word_index = {words[i]: i for i in range(len(words))}
+
+    def __contains__(self, word):
+        return word in self.word_index
+
+    def indices(self, word_list):
+        return np.array([self.word_index[w] for w in word_list], dtype=np.intp)
+
+    def responses(self, guess, answers):
+        """Encoded responses for one guess against an array of answers."""
+        return self.matrix[self.word_index[guess]][self.indices(answers)]
+
+
+def feedback_cache_path(dict_file, word_length):
+    return dict_file + "." + str(word_length) + ".feedback.v" + str(FORMAT_VERSION) + "." + dictionary_fingerprint(dict_file) + ".npy"
+
+def load_feedback_matrix(dict_file, word_length, rebuild=False):
+    with instrumentation.timer('load_feedback_matrix'):
+        return _load_feedback_matrix(dict_file, word_length, rebuild)
+
+def _load_feedback_matrix(dict_file, word_length, rebuild=False):
+    words = np.array(get_full_word_list(dict_file, word_length))
+    cache_file = feedback_cache_path(dict_file, word_length)
+    if rebuild or not os.path.exists(cache_file):
+        instrumentation.count('feedback_matrix_builds')
+        remove_stale_files(glob.escape(dict_file) + "." + str(word_length) + ".feedback.v*.npy", (cache_file,))
+        codes = words_to_codes(words)
+        tmp_file = temporary_path(cache_file)
+        out = np.lib.format.open_memmap(tmp_file, mode='w+', dtype=feedback_dtype(word_length), shape=(len(words), len(words)))
+        fill_feedback_matrix(out, codes, codes)
+        out.flush()
+        del out
+        os.replace(tmp_file, cache_file)
+    matrix = np.load(cache_file, mmap_mode='r')
+    if matrix.shape != (len(words), len(words)):
+        return _load_feedback_matrix(dict_file, word_length, rebuild=True)
+    return FeedbackMatrix(words, matrix, cache_file)
+
+
+if __name__ == "__main__":
+
+    dict_file = sys.argv[1]
+    for word_length in sys.argv[2:]:
+        feedback = load_feedback_matrix(dict_file, int(word_length))
+        print(dict_file, word_length, feedback.matrix.shape)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Word frequency weights as plain arrays rather than pickled dicts.
+
+For each (dictionary, word length) the weights are stored as a float32 .npy
+array in the same order as get_full_word_list, already normalized (divided
+by the largest frequency, with words missing from the counts given the
+smallest). Loading is a
+memory-mapped np.load with no unpickling, and the dictionary's content hash
+is in the file name so a changed dictionary needs a new conversion.
+
+Nothing that loads weights unpickles anything. Running this file converts
+the frequency pickles next to a dictionary, and has to be done (once, offline)
+whenever the pickles or the dictionary change, e.g.
+python frequency_weights.py wordle_dictionary.txt wordle_unlimited_dictionary.txt
+"""
+
+from wordle_dictionary import get_full_word_list, get_word_lengths, dictionary_fingerprint, remove_stale_files, temporary_path
+import instrumentation
+import numpy as np
+import hashlib
+import pickle
+import glob
+import sys
+import os
+
+WEIGHTS_VERSION = 1
+
+
+def frequency_pickle_path(dict_file, word_length):
+    return dict_file + "." + str(word_length) + ".pkl"
+
+def weights_path(dict_file, word_length):
+    return dict_file + "." + str(word_length) + ".weights.v" + str(WEIGHTS_VERSION) + "." + dictionary_fingerprint(dict_file) + ".npy"
+
+def normalize_frequencies(words, frequency_dict):
+    """Weights for words, in order, divided by the largest count (the smallest for missing words)."""
+    counts = np.array(list(frequency_dict.values()), dtype=float)
+    max_freq, min_freq = np.max(counts), np.min(counts)
+    weights = np.array([frequency_dict.get(w, min_freq) for w in words], dtype=float)
+    return (weights / max_freq).astype(np.float32)
+
+def save_frequency_weights(dict_file, word_length, frequency_dict):
+    """Write the weights for a dictionary of raw counts, replacing any older version."""
+    words = get_full_word_list(dict_file, word_length)
+    path = weights_path(dict_file, word_length)
+    remove_stale_files(glob.escape(dict_file) + "." + str(word_length) + ".weights.v*.npy", (path,))
+    np.save(temporary_path(path), normalize_frequencies(words, frequency_dict))
+    os.replace(temporary_path(path), path)
+    return path
+
+def convert_frequency_pickle(dict_file, word_length):
+    #Only for pickles written by get_word_frequencies.py, unpickling is not safe for untrusted files
+    frequency_dict = pickle.load(open(frequency_pickle_path(dict_file, word_length), 'rb'))
+    return save_frequency_weights(dict_file, word_length, frequency_dict)
+
+def weights_fingerprint(dict_file, word_length):
+    """Hash of the current weights file's contents, or '' if there isn't one."""
+    path = weights_path(dict_file, word_length)
+    if not os.path.exists(path):
+        return ''
+    with open(path, 'rb') as weights_file:
+        return hashlib.sha1(weights_file.read()).hexdigest()[0:12]
+
+def has_frequency_weights(dict_file, word_length):
+    return os.path.exists(weights_path(dict_file, word_length)) or os.path.exists(frequency_pickle_path(dict_file, word_length))
+
+def load_frequency_weights(dict_file, word_length):
+    """Memory-mapped float32 weights aligned to get_full_word_list, or None if there are no frequencies.
+
+    A frequency pickle without an up to date weights file is an error, it
+    has to be converted by running this file.
+    """
+    path = weights_path(dict_file, word_length)
+    if not os.path.exists(path):
+        if not os.path.exists(frequency_pickle_path(dict_file, word_length)):
+            return None
+        raise FileNotFoundError("No up to date weights for " + frequency_pickle_path(dict_file, word_length) + ", convert it with: python frequency_weights.py " + dict_file)
+    with instrumentation.timer('load_frequencies'):
+        return np.load(path, mmap_mode='r')
+
+def weights_to_dict(words, weights):
+    return dict(zip(np.asarray(words).tolist(), np.asarray(weights, dtype=float).tolist()))
+
+
+if __name__ == "__main__":
+
+    for dict_file in sys.argv[1:]:
+        for word_length in get_word_lengths(dict_file):
+            if os.path.exists(frequency_pickle_path(dict_file, word_length)):
+                print("Converted", convert_frequency_pickle(dict_file, word_length))
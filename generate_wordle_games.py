@@ -3,50 +3,100 @@
 Created on Tue Feb 22 19:42:00 2022
 
 @author: tobycrisford
+
+Finds puzzles of the form "these clues, with these colours, leave exactly one
+possible answer: what is it?". Every word's responses to the clues are
+computed at once as encoded feedback, and words are grouped on their combined
+responses with np.unique, so a word is a puzzle answer when its group has
+size one. Puzzles are ranked by the fewest greys any of their clues got (more
+greys makes for a harder puzzle, up to five), and many clue sets can be given in one run,
+e.g.
+python generate_wordle_games.py richard crane,sloth --output-dir puzzles
 """
 
-from wordle_dictionary import get_full_word_list
+from wordle_dictionary import load_word_codes, codes_to_words
+from feedback_matrix import words_to_codes, compute_feedback, decode_response
+from wordle_vis import create_vis, render_vis, VisDocument, VisArchive
+from contextlib import ExitStack
 import numpy as np
-import wordle_solver
-from tqdm import tqdm
-import pandas as pd
-from wordle_vis import create_vis
-
-clues = ["richard"]
-
-word_list = np.array(get_full_word_list("wordle_unlimited_dictionary.txt", len(clues[0])))
-
-potential_responses = dict()
-for clue in clues:
-    responses = []
-    for word in word_list:
-        responses.append(wordle_solver.simulate_wordle_response(word, clue))
-    potential_responses[clue] = np.array(responses)
-
-potential_answers = {column: [] for column in ["word", "value"] + clues}
-for i in tqdm(range(len(word_list))):
-    word = word_list[i]
-    candidate_words = np.full(len(word_list), True)
-    for clue in clues:
-        candidate_words = candidate_words & (potential_responses[clue] == potential_responses[clue][i])
-    if np.sum(candidate_words) == 1:
-        min_dash = 5
-        for clue in clues:
-            min_dash = min(min_dash, potential_responses[clue][i].count("-"))
-        potential_answers["word"].append(word)
-        potential_answers["value"].append(min_dash)
-        for clue in clues:
-            potential_answers[clue].append(potential_responses[clue][i])
-        
-potential_answers_df = pd.DataFrame(potential_answers).sort_values("value", ascending=False)
-print("---")      
-print(potential_answers_df.iloc[0:20])
-
-
-def create_output(df_index, filename):
-    
-    row_to_use = potential_answers_df.loc[df_index]
-    responses = []
-    for clue in clues:
-        responses.append(row_to_use[clue])
-    create_vis(clues, responses, filename)
\ No newline at end of file
+import argparse
+import os
+
+MAX_VALUE = 5 #Puzzle values are capped, so longer clues with more greys rank alongside five grey ones
+
+
+def get_clue_responses(word_codes, clues):
+    """Encoded response of every word to each clue, with shape (len(word_codes), len(clues))."""
+    return compute_feedback(words_to_codes(clues), word_codes).T
+
+def count_greys(responses, word_length):
+    greys = np.zeros(responses.shape, dtype=int)
+    for i in range(word_length):
+        greys += (responses // 3**i) % 3 == 0
+    return greys
+
+def find_puzzles(word_codes, clues):
+    """Indices of the words identified uniquely by their responses to the clues, best puzzles first, and their values."""
+    responses = get_clue_responses(word_codes, clues)
+    unique_responses, inverse, counts = np.unique(responses, axis=0, return_inverse=True, return_counts=True)
+    answers = np.where(counts[inverse.ravel()] == 1)[0]
+    values = np.minimum(np.min(count_greys(responses[answers], word_codes.shape[1]), axis=1), MAX_VALUE)
+    order = np.argsort(-1 * values, kind='stable')
+    return answers[order], values[order], responses[answers[order]]
+
+def generate_puzzles(dict_file, clue_sets, top=None):
+    """Yields a dict for each puzzle, clue set by clue set, best puzzles first."""
+    word_codes = dict()
+    for clues in clue_sets:
+        word_length = len(clues[0])
+        if word_length not in word_codes:
+            word_codes[word_length] = np.asarray(load_word_codes(dict_file, word_length))
+        answers, values, responses = find_puzzles(word_codes[word_length], clues)
+        words = codes_to_words(word_codes[word_length][answers[0:top]])
+        for i in range(len(words)):
+            yield {'clues': clues,
+                   'answer': words[i],
+                   'value': int(values[i]),
+                   'responses': [decode_response(code, word_length) for code in responses[i]]}
+
+def create_output(puzzle, filename):
+
+    create_vis(puzzle['clues'], puzzle['responses'], filename)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("clue_sets", nargs="*", help="Comma separated clues of the same length, e.g. crane,sloth")
+    parser.add_argument("--clue-file", default=None, help="File with one comma separated clue set per line")
+    parser.add_argument("--dictionary", default="wordle_unlimited_dictionary.txt")
+    parser.add_argument("--top", type=int, default=20, help="Puzzles kept per clue set")
+    parser.add_argument("--output-dir", default=None, help="Write each puzzle's visualisation here")
+    parser.add_argument("--document", default=None, help="Write every puzzle's visualisation into this one HTML file")
+    parser.add_argument("--archive", default=None, help="Write each puzzle's visualisation into this zip file")
+    parser.add_argument("--svg", action="store_true", help="Print each puzzle's visualisation after it")
+    args = parser.parse_args()
+
+    clue_sets = [clue_set.split(",") for clue_set in args.clue_sets]
+    if args.clue_file is not None:
+        with open(args.clue_file) as f:
+            clue_sets += [line.strip().split(",") for line in f if line.strip() != ""]
+    if len(clue_sets) == 0:
+        clue_sets = [["richard"]]
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    with ExitStack() as stack:
+        document = stack.enter_context(VisDocument(args.document)) if args.document is not None else None
+        archive = stack.enter_context(VisArchive(args.archive)) if args.archive is not None else None
+        for puzzle in generate_puzzles(args.dictionary, clue_sets, args.top):
+            print(",".join(puzzle['clues']), puzzle['answer'], puzzle['value'], " ".join(puzzle['responses']))
+            filename = "_".join(puzzle['clues']) + "_" + puzzle['answer'] + ".html"
+            if args.svg:
+                print(render_vis(puzzle['clues'], puzzle['responses']), end="")
+            if args.output_dir is not None:
+                create_output(puzzle, os.path.join(args.output_dir, filename))
+            if document is not None:
+                document.add(puzzle['clues'], puzzle['responses'])
+            if archive is not None:
+                archive.add(puzzle['clues'], puzzle['responses'], filename)
@@ -4,35 +4,83 @@ Created on Fri Jan 14 17:24:04 2022
 
 @author: tobycrisford
 
-This script extracts word frequencies for your chosen word list
+This script extracts word frequencies for your chosen word lists
 from the files found here: http://storage.googleapis.com/books/ngrams/books/datasetsv2.html
-and saves them in a pickle for convenient extraction during the game.
+and saves them in pickles, and as the normalized weight arrays read
+during the game (see frequency_weights.py).
+
+Every shard under the word_frequencies directory (plain or gzip compressed)
+is streamed once, with shards shared out between a process pool, and the
+counts for every word of every chosen dictionary are collected in that one
+pass. A pickle is then written for each (dictionary, word length), e.g.
+wordle_unlimited_dictionary.txt.8.pkl.
 """
 
-from wordle_dictionary import get_full_word_list
+from wordle_dictionary import get_word_lengths, get_full_word_list
+from frequency_weights import save_frequency_weights
 from tqdm import tqdm
-import requests
+import multiprocessing
+import argparse
 import pickle
-import time
+import gzip
 import os
 
-filename = 'wordle_dictionary.txt'
-word_length = 5
+_worker_state = dict()
+
 
-word_list = get_full_word_list(filename,word_length)
+def find_shards(directory):
+    shards = []
+    for root, dirs, files in os.walk(directory):
+        for f in files:
+            shards.append(os.path.join(root, f))
+    return sorted(shards)
 
-word_set = set(word_list)
+def open_shard(shard):
+    if shard.endswith('.gz'):
+        return gzip.open(shard, 'rt', encoding='utf-8')
+    return open(shard, encoding='utf-8')
 
-frequency_dict = dict()
+def init_worker(word_set):
+    _worker_state['word_set'] = word_set
 
-for f in os.listdir('./word_frequencies'):
-    with open('word_frequencies/' + f + '/' + f, encoding='utf-8') as file:
-        for line in tqdm(file):
-            row = line.split("\t")
+def count_shard(shard):
+    word_set = _worker_state['word_set']
+    frequency_dict = dict()
+    with open_shard(shard) as file:
+        for line in file:
+            row = line.split("\t", 3)
             if row[0] in word_set:
-                if row[0] in frequency_dict:
-                    frequency_dict[row[0]] += int(row[2])
-                else:
-                    frequency_dict[row[0]] = int(row[2])
+                frequency_dict[row[0]] = frequency_dict.get(row[0], 0) + int(row[2])
+    return frequency_dict
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--directory", default="word_frequencies")
+    parser.add_argument("--dictionaries", nargs="+", default=["wordle_dictionary.txt", "wordle_unlimited_dictionary.txt"])
+    parser.add_argument("--lengths", nargs="+", type=int, default=None, help="Word lengths to write (default: every length in each dictionary)")
+    parser.add_argument("--processes", type=int, default=int(os.environ.get('WORDLE_PROCESSES', 1)))
+    args = parser.parse_args()
+
+    word_lists = dict()
+    for filename in args.dictionaries:
+        lengths = args.lengths if args.lengths is not None else get_word_lengths(filename)
+        for word_length in lengths:
+            word_lists[(filename, word_length)] = get_full_word_list(filename, word_length)
+    word_set = set()
+    for key in word_lists:
+        word_set.update(word_lists[key])
+
+    shards = find_shards(args.directory)
+    frequency_dict = dict()
+    with multiprocessing.Pool(args.processes, initializer=init_worker, initargs=(word_set,)) as pool:
+        for shard_counts in tqdm(pool.imap_unordered(count_shard, shards), total=len(shards)):
+            for w in shard_counts:
+                frequency_dict[w] = frequency_dict.get(w, 0) + shard_counts[w]
 
-pickle.dump(frequency_dict, open(filename + "." + str(word_length) + ".pkl","wb"))
\ No newline at end of file
+    for (filename, word_length) in word_lists:
+        counts = {w: frequency_dict[w] for w in word_lists[(filename, word_length)] if w in frequency_dict}
+        if len(counts) > 0:
+            pickle.dump(counts, open(filename + "." + str(word_length) + ".pkl","wb"))
+            save_frequency_weights(filename, word_length, counts)
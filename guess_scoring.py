@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+Batched scoring of guesses against a set of possibilities.
+
+Feedback codes for a block of guesses are either read from a precomputed
+FeedbackMatrix or computed on the fly, and the weight of each response is
+counted with a single bincount over the whole block (or, for the two or die
+objective, the largest weight is found with a grouped maximum over the same
+offsets). Blocks are sized so the
+working arrays stay within a memory budget (in bytes), which can be set with
+the WORDLE_MEMORY_BUDGET environment variable.
+
+Blocks can also be farmed out to a process pool (WORDLE_PROCESSES sets the
+default number of processes). The guess, answer and weight arrays are put in
+shared memory and the feedback matrix is memory-mapped by each worker, so
+only block boundaries and scores are sent between processes. Blocks are the
+same as in the serial path, so the scores are identical.
+"""
+
+import numpy as np
+from feedback_matrix import words_to_codes, compute_feedback
+from multiprocessing import shared_memory
+from tqdm import tqdm
+import instrumentation
+import multiprocessing
+import os
+
+DEFAULT_MEMORY_BUDGET = int(os.environ.get('WORDLE_MEMORY_BUDGET', 256 * 2**20))
+DEFAULT_PROCESSES = int(os.environ.get('WORDLE_PROCESSES', 1))
+COMPACT_FACTOR = 8 #Count compact responses when there are this many times more responses than possibilities
+
+_worker_state = dict()
+
+
+def get_batch_size(n_possibilities, word_length, memory_budget=DEFAULT_MEMORY_BUDGET):
+    #Per guess we hold the codes, their offsets and weights, plus a row of response counts
+    bytes_per_guess = n_possibilities * (4 + 8 + 8 + 2 * word_length) + 3**word_length * 8 * 2
+    return max(1, int(memory_budget // bytes_per_guess))
+
+def get_weights(possibilities, frequency_dict):
+    return np.array([frequency_dict[r] for r in possibilities], dtype=float)
+
+def get_compact_responses(codes, weights):
+    """Each row of codes relabelled 0, 1, 2, ... by distinct response, and the weights in matching order.
+
+    With far fewer possibilities than responses (3**8 = 6561 for 8 symbol
+    nerdle), counting into one column per possibility rather than one per
+    response keeps the rows short. The objectives only sum over responses,
+    and empty ones add nothing, so the labels don't change the scores.
+    """
+    order = np.argsort(codes, axis=1, kind='stable')
+    sorted_codes = np.take_along_axis(codes, order, axis=1)
+    labels = np.zeros(codes.shape, dtype=np.intp)
+    np.cumsum(sorted_codes[:, 1:] != sorted_codes[:, :-1], axis=1, out=labels[:, 1:])
+    return labels, weights[order]
+
+def get_response_offsets(codes, weights, word_length, tiled_weights=None):
+    """(flat offsets, matching weights, columns per row) for counting responses row by row."""
+    n_codes = 3**word_length
+    if codes.shape[1] * COMPACT_FACTOR <= n_codes:
+        offsets, row_weights = get_compact_responses(codes, weights)
+        n_codes, flat_weights = codes.shape[1], row_weights.ravel()
+    else:
+        if tiled_weights is None:
+            tiled_weights = np.tile(weights, len(codes))
+        offsets, flat_weights = codes.astype(np.intp), tiled_weights[0:codes.size]
+    offsets += (np.arange(len(codes), dtype=np.intp) * n_codes)[:, None]
+    return offsets.ravel(), flat_weights, n_codes
+
+def get_response_weights(codes, weights, word_length, tiled_weights=None):
+    """Total weight of each response for each row of a block of feedback codes.
+
+    tiled_weights can be passed in (np.tile(weights, batch_size)) to avoid
+    rebuilding it for every batch.
+    """
+    offsets, flat_weights, n_columns = get_response_offsets(codes, weights, word_length, tiled_weights)
+    counts = np.bincount(offsets, weights=flat_weights, minlength=len(codes) * n_columns)
+    return counts.reshape(len(codes), n_columns)
+
+def get_response_max_weights(codes, weights, word_length, tiled_weights=None):
+    """Largest weight among the possibilities giving each response, for each row of a block.
+
+    A grouped max over the same offsets as get_response_weights. Weights must
+    be non-negative.
+    """
+    offsets, flat_weights, n_columns = get_response_offsets(codes, weights, word_length, tiled_weights)
+    max_weights = np.zeros(len(codes) * n_columns)
+    np.maximum.at(max_weights, offsets, flat_weights)
+    return max_weights.reshape(len(codes), n_columns)
+
+def get_entropies(response_weights, normalization_factor):
+    probabilities = response_weights / normalization_factor
+    return -1 * np.sum(probabilities * np.log2(np.where(probabilities > 0, probabilities, 1)), axis=1)
+
+def get_negative_expected_remaining(response_weights, normalization_factor):
+    #Expected fraction of the weight still remaining after the guess, negated so higher is better
+    probabilities = response_weights / normalization_factor
+    return -1 * np.sum(probabilities**2, axis=1)
+
+def get_negative_largest_response(response_weights, normalization_factor):
+    #Weight of the biggest group left after the guess (what an adversary would pick), negated so higher is better
+    return -1 * np.max(response_weights, axis=1)
+
+def get_next_guess_success(max_weights, normalization_factor):
+    #Whatever the response, we then guess the most likely word giving it
+    return np.sum(max_weights, axis=1) / normalization_factor
+
+def score_block(guess_rows, answer_rows, weights, word_length, matrix=None, tiled_weights=None, objective=get_entropies, reduction=get_response_weights):
+    """Scores (entropies by default) for a block of guesses.
+
+    With a feedback matrix, guess_rows and answer_rows are indices into it,
+    otherwise they are letter code arrays from words_to_codes. reduction
+    combines the weights of the possibilities giving each response (a sum by
+    default) and objective turns those into scores.
+    """
+    if matrix is not None:
+        codes = matrix[np.ix_(guess_rows, answer_rows)]
+    else:
+        codes = compute_feedback(guess_rows, answer_rows)
+    return objective(reduction(codes, weights, word_length, tiled_weights), np.sum(weights))
+
+def share_array(array):
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+def attach_array(descriptor):
+    name, shape, dtype = descriptor
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+def init_worker(descriptors, matrix_path, word_length, batch_size, objective, reduction):
+    for key in descriptors:
+        _worker_state[key + '_shm'], _worker_state[key] = attach_array(descriptors[key])
+    if matrix_path is not None:
+        _worker_state['matrix'] = np.load(matrix_path, mmap_mode='r')
+    elif 'matrix' not in descriptors:
+        _worker_state['matrix'] = None
+    _worker_state['word_length'] = word_length
+    _worker_state['objective'] = objective
+    _worker_state['reduction'] = reduction
+    _worker_state['tiled_weights'] = np.tile(_worker_state['weights'], batch_size)
+
+def score_shard(bounds):
+    start, stop = bounds
+    s = _worker_state
+    return score_block(s['guesses'][start:stop], s['answers'], s['weights'], s['word_length'], s['matrix'], s['tiled_weights'], s['objective'], s['reduction'])
+
+def score_rows(guesses, answers, weights, word_length, matrix=None, matrix_path=None, memory_budget=DEFAULT_MEMORY_BUDGET, progress=True, n_processes=DEFAULT_PROCESSES, objective=get_entropies, reduction=get_response_weights):
+    """Score every guess against the answers, in blocks.
+
+    guesses and answers are feedback matrix rows, or letter code arrays if
+    there is no matrix. If the matrix is stored on disk, pass its path so
+    worker processes can memory-map it rather than receive a copy.
+    """
+    batch_size = min(get_batch_size(len(answers), word_length, memory_budget), len(guesses))
+    bounds = [(start, min(start + batch_size, len(guesses))) for start in range(0, len(guesses), batch_size)]
+    scores = np.zeros(len(guesses))
+    instrumentation.count('scoring_batches', len(bounds))
+    instrumentation.count('scored_pairs', len(guesses) * len(answers))
+    
+    if n_processes > 1 and len(bounds) > 1:
+        arrays = {'guesses': guesses, 'answers': answers, 'weights': weights}
+        if (matrix is not None) and (matrix_path is None):
+            arrays['matrix'] = np.asarray(matrix)
+        shared = {key: share_array(arrays[key]) for key in arrays}
+        try:
+            with instrumentation.timer('scoring'), multiprocessing.Pool(min(n_processes, len(bounds)), initializer=init_worker, initargs=({key: shared[key][1] for key in shared}, matrix_path, word_length, batch_size, objective, reduction)) as pool:
+                block_scores = pool.imap(score_shard, bounds)
+                for (start, stop), block in zip(bounds, tqdm(block_scores, total=len(bounds)) if progress else block_scores):
+                    scores[start:stop] = block
+        finally:
+            for key in shared:
+                shared[key][0].close()
+                shared[key][0].unlink()
+        return scores
+    
+    with instrumentation.timer('scoring'):
+        tiled_weights = np.tile(weights, batch_size)
+        for start, stop in (tqdm(bounds) if progress else bounds):
+            scores[start:stop] = score_block(guesses[start:stop], answers, weights, word_length, matrix, tiled_weights, objective, reduction)
+    return scores
+
+def get_expected_information(word_list, possibilities, frequency_dict, feedback=None, memory_budget=DEFAULT_MEMORY_BUDGET, progress=True, n_processes=DEFAULT_PROCESSES):
+    """Expected information (in bits) provided by each guess in word_list."""
+    weights = get_weights(possibilities, frequency_dict)
+    if feedback is not None:
+        guesses, answers, matrix, matrix_path = feedback.indices(word_list), feedback.indices(possibilities), feedback.matrix, feedback.path
+    else:
+        guesses, answers, matrix, matrix_path = words_to_codes(word_list), words_to_codes(possibilities), None, None
+    return score_rows(guesses, answers, weights, len(word_list[0]), matrix, matrix_path, memory_budget, progress, n_processes)
+
+def get_information_bounds(guess_codes, answer_codes, weights):
+    """Cheap upper bounds on the expected information of each guess.
+
+    The response is made up of one outcome per position, so its entropy is at
+    most the sum of the entropies of the positions. Each of those is the
+    entropy of turning green (known exactly from the letter frequencies in
+    each position) plus at most one bit, or nothing if no answer contains the
+    letter so it can't turn orange. The response also can't carry more
+    information than the answer itself, so the entropy of the answers caps
+    every bound.
+    """
+    probabilities = weights / np.sum(weights)
+    nonzero = probabilities[probabilities > 0]
+    answer_entropy = -1 * np.sum(nonzero * np.log2(nonzero))
+    present = np.zeros(256, dtype=bool)
+    present[np.unique(answer_codes)] = True
+    bounds = np.zeros(len(guess_codes))
+    for i in range(guess_codes.shape[1]):
+        green_prob = np.bincount(answer_codes[:, i], weights=probabilities, minlength=256)[guess_codes[:, i]]
+        green_prob = np.clip(green_prob, 0, 1)
+        for p in (green_prob, 1 - green_prob):
+            bounds += np.where(p > 0, -1 * p * np.log2(np.where(p > 0, p, 1)), 0)
+        bounds += (1 - green_prob) * present[guess_codes[:, i]]
+    return np.minimum(bounds, answer_entropy)
+
+def rank_scores(scores, k=None):
+    """Indices of the k highest scores, best first, with ties going to the lower index."""
+    return np.lexsort((np.arange(len(scores)), -1 * np.asarray(scores)))[0:k]
+
+def get_top_expected_information(word_list, possibilities, frequency_dict, k, feedback=None, boost=None, memory_budget=DEFAULT_MEMORY_BUDGET, tolerance=1e-9, n_processes=DEFAULT_PROCESSES, progress=False):
+    """Indices of the k guesses with the most expected information (plus boost), and their scores.
+
+    Guesses are scored in order of their upper bound, and scoring stops once
+    no remaining bound can beat the k-th best score found so far, so the
+    result is the same as scoring everything and taking the top k. When the
+    bounds stop pruning (most of what is left could still make the top k),
+    everything left that could is scored in one go, on the process pool.
+    """
+    if boost is None:
+        boost = np.zeros(len(word_list))
+    if (k <= 0) or (len(word_list) == 0):
+        return np.zeros(0, dtype=np.intp), np.zeros(0)
+    if len(possibilities) == 0:
+        #No guess can tell apart answers that don't exist, as when scoring everything
+        top = rank_scores(boost, k)
+        return top, np.asarray(boost, dtype=float)[top]
+    weights = get_weights(possibilities, frequency_dict)
+    guess_codes, answer_codes = words_to_codes(word_list), words_to_codes(possibilities)
+    if feedback is not None:
+        guesses, answers, matrix, matrix_path = feedback.indices(word_list), feedback.indices(possibilities), feedback.matrix, feedback.path
+    else:
+        guesses, answers, matrix, matrix_path = guess_codes, answer_codes, None, None
+    k = min(k, len(word_list))
+    bounds = get_information_bounds(guess_codes, answer_codes, weights) + boost
+    order = np.argsort(-1 * bounds, kind='stable')
+    #Small batches so that pruning starts early
+    batch_size = max(k, min(get_batch_size(len(possibilities), len(word_list[0]), memory_budget), 512))
+    scores = np.full(len(word_list), -np.inf)
+    scored = np.zeros(len(word_list), dtype=bool)
+    kth_best = -np.inf
+    while True:
+        remaining = order[~scored[order]]
+        survivors = remaining[bounds[remaining] >= kth_best - tolerance]
+        if len(survivors) == 0:
+            break
+        if np.any(scored) and (2 * len(survivors) > len(remaining)):
+            batch = survivors
+            scores[batch] = score_rows(guesses[batch], answers, weights, len(word_list[0]), matrix, matrix_path, memory_budget, progress, n_processes) + boost[batch]
+            scored[batch] = True
+            break
+        batch = survivors[0:batch_size]
+        scores[batch] = score_rows(guesses[batch], answers, weights, len(word_list[0]), matrix, memory_budget=memory_budget, progress=False, n_processes=1) + boost[batch]
+        scored[batch] = True
+        kth_best = np.partition(scores, len(scores) - k)[len(scores) - k]
+    instrumentation.count('top_k_pruned_guesses', int(np.sum(~scored)))
+    top = rank_scores(scores, k)
+    return top, scores[top]
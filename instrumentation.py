@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Counters and timers for finding out where the solver's time goes.
+
+Switched on with the WORDLE_TRACE environment variable (or the --trace option
+of the scripts), and otherwise every hook returns straight away. Counts and
+times are grouped into turns with end_turn(), which gives a summary of the
+turn, and the trace of all turns can be written out as JSON. If
+WORDLE_TRACE_FILE is set, the trace is written there when the process exits.
+
+    with timer('scoring'):
+        ...
+    count('cache_hit')
+"""
+
+from contextlib import nullcontext
+import atexit
+import json
+import time
+import os
+
+enabled = os.environ.get('WORDLE_TRACE', '') not in ('', '0')
+trace_file = os.environ.get('WORDLE_TRACE_FILE')
+
+counters = dict()
+timers = dict()
+turns = []
+_null_timer = nullcontext()
+
+
+class Timer:
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        entry = timers.setdefault(self.name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+        return False
+
+
+def enable(path=None):
+    global enabled, trace_file
+    enabled = True
+    if path is not None:
+        trace_file = path
+
+def count(name, n=1):
+    if enabled:
+        counters[name] = counters.get(name, 0) + n
+
+def timer(name):
+    if not enabled:
+        return _null_timer
+    return Timer(name)
+
+def end_turn(label=None):
+    """Close the current turn, and return its counts and times (None if disabled)."""
+    if not enabled:
+        return None
+    turn = {'turn': len(turns) + 1 if label is None else label,
+            'counters': dict(counters),
+            'timers': {name: {'calls': timers[name][0], 'seconds': timers[name][1]} for name in timers}}
+    turns.append(turn)
+    counters.clear()
+    timers.clear()
+    return turn
+
+def format_turn(turn):
+    lines = ["Turn " + str(turn['turn']) + ":"]
+    for name in sorted(turn['timers'], key=lambda name: -turn['timers'][name]['seconds']):
+        lines.append("  " + name + ": " + format(turn['timers'][name]['seconds'], '.4f') + "s over " + str(turn['timers'][name]['calls']) + " calls")
+    for name in sorted(turn['counters']):
+        lines.append("  " + name + ": " + str(turn['counters'][name]))
+    return "\n".join(lines)
+
+def get_trace():
+    """All turns so far, plus totals, including anything recorded since the last end_turn()."""
+    all_turns = turns + ([{'turn': 'unfinished', 'counters': dict(counters), 'timers': {name: {'calls': timers[name][0], 'seconds': timers[name][1]} for name in timers}}] if (len(counters) > 0 or len(timers) > 0) else [])
+    totals = {'counters': dict(), 'timers': dict()}
+    for turn in all_turns:
+        for name in turn['counters']:
+            totals['counters'][name] = totals['counters'].get(name, 0) + turn['counters'][name]
+        for name in turn['timers']:
+            entry = totals['timers'].setdefault(name, {'calls': 0, 'seconds': 0.0})
+            entry['calls'] += turn['timers'][name]['calls']
+            entry['seconds'] += turn['timers'][name]['seconds']
+    return {'pid': os.getpid(), 'turns': all_turns, 'totals': totals}
+
+def write_trace(path=None):
+    path = trace_file if path is None else path
+    if enabled and (path is not None):
+        with open(path, "w") as f:
+            json.dump(get_trace(), f, indent=2)
+
+atexit.register(write_trace)
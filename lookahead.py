@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Multi-step lookahead: choose the guess that minimizes the expected total
+number of guesses, or maximizes the chance of winning within the turns left,
+rather than the one that gives the most information right now.
+
+The search is depth limited. At each position only a beam of guesses is
+tried: the best few by expected information, plus the most likely answers
+(which can win straight away). Values of positions are memoized on the set of
+remaining candidates, and positions beyond the depth limit get a rough
+estimate from their entropy. The search deepens one level at a time until a
+time budget runs out, and returns the best guess from the deepest search that
+finished, so it can run under a fixed latency budget.
+
+In hard mode the guesses allowed shrink along each line of play, so the
+search carries the allowed guess rows down with the candidates, narrowing
+them after each response.
+"""
+
+from guess_scoring import score_rows
+from feedback_matrix import decode_response
+from constraint_filter import unpack_bits
+from nerdle import get_constraint_index
+import numpy as np
+import hashlib
+import instrumentation
+import time
+
+EXPECTED_GUESSES = 'expected_guesses'
+WIN_PROBABILITY = 'win_probability'
+
+BITS_PER_GUESS = 3.0 #Rough information gained per guess, used to estimate positions beyond the search depth
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def hard_mode_narrowing(feedback):
+    """Function giving the guess rows hard mode still allows after a guess row gets a response code."""
+    index = get_constraint_index(feedback.words)
+    def narrow(guesses, guess, code):
+        allowed = unpack_bits(index.hard_mode_bits(feedback.words[guess], decode_response(code, feedback.word_length)), len(feedback.words))
+        return guesses[allowed[guesses]]
+    return narrow
+
+def guesses_key(guesses, narrow):
+    #Without narrowing every position has the same guesses, so they needn't be part of memo keys
+    return None if narrow is None else hashlib.blake2b(guesses.tobytes(), digest_size=16).digest()
+
+
+class LookaheadSearch:
+    """Lookahead over feedback matrix rows, with weights giving the prior on each answer.
+
+    guesses are the rows that can be guessed (every row by default), and
+    narrow, if given, narrows them after each response as in hard mode.
+    """
+
+    def __init__(self, matrix, weights, word_length, objective=EXPECTED_GUESSES, beam_width=8, n_likely=2, deadline=None, guesses=None, narrow=None):
+        self.matrix = matrix
+        self.weights = weights
+        self.word_length = word_length
+        self.objective = objective
+        self.beam_width = beam_width
+        self.n_likely = n_likely
+        self.deadline = deadline
+        self.guesses = np.arange(matrix.shape[0]) if guesses is None else guesses
+        self.narrow = narrow
+        self.solved_code = 3**word_length - 1
+        self.memo = dict()
+        self.beams = dict()
+
+    def check_deadline(self):
+        if (self.deadline is not None) and (time.perf_counter() > self.deadline):
+            raise SearchTimeout()
+
+    def beam(self, candidates, guesses):
+        key = (candidates.tobytes(), guesses_key(guesses, self.narrow))
+        if key not in self.beams:
+            weights = self.weights[candidates]
+            scores = score_rows(guesses, candidates, weights, self.word_length, self.matrix, progress=False, n_processes=1)
+            scores[np.isin(guesses, candidates)] += 0.0001 #Break ties in favour of words that could be right
+            width = min(self.beam_width, len(scores))
+            top = np.argpartition(-1 * scores, width - 1)[0:width]
+            top = guesses[top[np.argsort(-1 * scores[top], kind='stable')]]
+            likely = candidates[np.argsort(-1 * weights, kind='stable')[0:self.n_likely]]
+            self.beams[key] = np.array(list(dict.fromkeys(np.concatenate([top, likely]).tolist())))
+        return self.beams[key]
+
+    def split(self, guess, candidates):
+        codes = self.matrix[guess][candidates]
+        order = np.argsort(codes, kind='stable')
+        unique_codes, starts = np.unique(codes[order], return_index=True)
+        return zip(unique_codes, np.split(candidates[order], starts[1:]))
+
+    def estimate(self, candidates, turns_left):
+        """Rough value of a position beyond the search depth."""
+        probabilities = self.weights[candidates] / np.sum(self.weights[candidates])
+        p_max = np.max(probabilities)
+        nonzero = probabilities[probabilities > 0]
+        entropy = -1 * np.sum(nonzero * np.log2(nonzero))
+        if self.objective == EXPECTED_GUESSES:
+            return 1 + (1 - p_max) * max(1, entropy / BITS_PER_GUESS)
+        if turns_left == 1:
+            return p_max
+        return min(1.0, p_max + (1 - p_max) * (turns_left - 1) * BITS_PER_GUESS / max(entropy, BITS_PER_GUESS))
+
+    def value(self, candidates, depth, turns_left, guesses):
+        """(value, best guess) of a position, searching depth guesses ahead."""
+        if len(candidates) == 1:
+            return (1.0 if self.objective == EXPECTED_GUESSES else float(turns_left >= 1)), candidates[0]
+        if (self.objective == WIN_PROBABILITY) and (turns_left <= 0):
+            return 0.0, None
+        if depth == 0:
+            return self.estimate(candidates, turns_left), None
+        key = (candidates.tobytes(), guesses_key(guesses, self.narrow), depth, turns_left if self.objective == WIN_PROBABILITY else None)
+        if key in self.memo:
+            instrumentation.count('lookahead_memo_hits')
+            return self.memo[key]
+        instrumentation.count('lookahead_nodes')
+
+        total_weight = np.sum(self.weights[candidates])
+        best = None
+        for guess in self.beam(candidates, guesses):
+            self.check_deadline()
+            future = 0.0
+            win_now = 0.0
+            for code, subset in self.split(guess, candidates):
+                p = np.sum(self.weights[subset]) / total_weight
+                if code == self.solved_code:
+                    win_now = p
+                else:
+                    next_guesses = guesses if self.narrow is None else self.narrow(guesses, guess, code)
+                    future += p * self.value(subset, depth - 1, turns_left - 1, next_guesses)[0]
+            if self.objective == EXPECTED_GUESSES:
+                candidate_value = 1 + future
+                better = (best is None) or (candidate_value < best[0])
+            else:
+                candidate_value = min(1.0, win_now + future)
+                better = (best is None) or (candidate_value > best[0])
+            if better:
+                best = (candidate_value, guess)
+
+        self.memo[key] = best
+        return best
+
+    def search(self, candidates, max_depth=3, turns_left=6):
+        """(best guess, its value, depth searched), deepening until max_depth or the deadline.
+
+        If not even the one step search finishes in time, the guess with the
+        most expected information is returned with value None.
+        """
+        result = (self.beam(candidates, self.guesses)[0], None, 0)
+        for depth in range(1, max_depth + 1):
+            try:
+                value, guess = self.value(candidates, depth, turns_left, self.guesses)
+            except SearchTimeout:
+                break
+            result = (guess, value, depth)
+        return result
+
+
+def get_lookahead_suggestion(feedback, weights, candidates, objective=EXPECTED_GUESSES, max_depth=3, beam_width=8, time_budget=None, turns_left=6, guesses=None, hard_mode=False):
+    """Best guess (as a word) for the candidates, which are feedback matrix rows.
+
+    weights gives the prior weight of every row of the feedback matrix, and
+    guesses the rows allowed as the next guess (every row by default). In
+    hard mode the guesses are narrowed by each response deeper in the search.
+    Returns (guess, value, depth searched).
+    """
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    narrow = hard_mode_narrowing(feedback) if hard_mode else None
+    search = LookaheadSearch(feedback.matrix, weights, feedback.word_length, objective=objective, beam_width=beam_width, deadline=deadline, guesses=guesses, narrow=narrow)
+    guess, value, depth = search.search(np.sort(candidates), max_depth=max_depth, turns_left=turns_left)
+    return feedback.words[guess], value, depth
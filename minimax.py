@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Minimax play, for hosts that pick the answer adversarially (like Absurdle,
+which always keeps the biggest group of words consistent with the result).
+
+The worst case for a guess is the biggest group of candidates giving the
+same response, and it is found for every guess at once by counting responses
+with the same batched bincount used for expected information.
+
+For small candidate sets, WorstCaseSolver finds the fewest guesses that are
+guaranteed to find the answer whatever it is, by a memoized search over
+every guess. Guesses are tried in order of their biggest group, and a guess
+is abandoned as soon as one of its groups needs as many guesses as the best
+found so far, so the result is exact but most guesses are never expanded.
+Proving that no guess does better can still take a long time for a few dozen
+candidates, so the search stops at a deadline like the lookahead search does.
+In hard mode the guesses allowed are narrowed along each line of play, as in
+the lookahead search.
+"""
+
+from lookahead import SearchTimeout, hard_mode_narrowing, guesses_key
+from guess_scoring import score_rows, get_response_weights, get_negative_largest_response, DEFAULT_MEMORY_BUDGET, DEFAULT_PROCESSES
+from feedback_matrix import words_to_codes
+import numpy as np
+import instrumentation
+import time
+
+DEFAULT_TIME_BUDGET = 2.0 #Seconds the interactive solver spends proving a worst case
+
+
+def get_largest_responses(guesses, answers, word_length, matrix=None, matrix_path=None, memory_budget=DEFAULT_MEMORY_BUDGET, progress=True, n_processes=DEFAULT_PROCESSES):
+    """Size of the biggest group of answers left by each guess (rows of the matrix, or letter codes without one)."""
+    weights = np.ones(len(answers))
+    return -1 * score_rows(guesses, answers, weights, word_length, matrix, matrix_path, memory_budget, progress, n_processes, objective=get_negative_largest_response)
+
+def get_minimax_suggestions(word_list, possibilities, feedback=None, memory_budget=DEFAULT_MEMORY_BUDGET, n_processes=DEFAULT_PROCESSES, progress=True, k=None):
+    """Indices of the guesses in word_list that leave the smallest worst case, and those worst case sizes.
+
+    Ties go to guesses that could be the answer.
+    """
+    if feedback is not None:
+        guesses, answers, matrix, matrix_path = feedback.indices(word_list), feedback.indices(possibilities), feedback.matrix, feedback.path
+    else:
+        guesses, answers, matrix, matrix_path = words_to_codes(word_list), words_to_codes(possibilities), None, None
+    largest = get_largest_responses(guesses, answers, len(word_list[0]), matrix, matrix_path, memory_budget, progress, n_processes)
+    r = np.lexsort((~np.isin(word_list, possibilities), largest))[0:k]
+    return r, largest[r]
+
+
+class WorstCaseSolver:
+    """Exact worst case number of guesses for sets of feedback matrix rows.
+
+    guesses are the rows that can be guessed (every row by default), and
+    narrow, if given, narrows them after each response as in hard mode.
+    """
+
+    def __init__(self, matrix, word_length, guesses=None, deadline=None, narrow=None):
+        self.matrix = matrix
+        self.deadline = deadline
+        self.word_length = word_length
+        self.guesses = np.arange(matrix.shape[0]) if guesses is None else guesses
+        self.narrow = narrow
+        self.solved_code = 3**word_length - 1
+        self.columns = dict() #Responses of every row for each answer searched so far
+        self.memo = dict() #(candidates, guesses) -> (depth, guess), with guess None if depth is only a lower bound
+
+    def check_deadline(self):
+        if (self.deadline is not None) and (time.perf_counter() > self.deadline):
+            raise SearchTimeout()
+
+    def get_codes(self, candidates, guesses):
+        for a in candidates:
+            if a not in self.columns:
+                self.columns[a] = np.asarray(self.matrix[:, a])
+        return np.stack([self.columns[a][guesses] for a in candidates], axis=1)
+
+    def split(self, guess, candidates):
+        """(code, group) for each response to guess but the solved one, biggest groups first."""
+        codes = self.matrix[guess][candidates]
+        order = np.argsort(codes, kind='stable')
+        unique_codes, starts, counts = np.unique(codes[order], return_index=True, return_counts=True)
+        groups = [(code, candidates[order][start:start + count]) for code, start, count in zip(unique_codes, starts, counts) if code != self.solved_code]
+        return sorted(groups, key=lambda group: len(group[1]), reverse=True)
+
+    def solve(self, candidates, limit=np.inf, guesses=None):
+        """(depth, guess) with the fewest guesses that always finds the answer among candidates.
+
+        If that takes limit guesses or more, returns (a lower bound of at
+        least limit, None) instead. guesses defaults to the solver's.
+        """
+        if len(candidates) == 1:
+            return 1, candidates[0]
+        guesses = self.guesses if guesses is None else guesses
+        key = (candidates.tobytes(), guesses_key(guesses, self.narrow))
+        if key in self.memo:
+            depth, guess = self.memo[key]
+            if (guess is not None) or (depth >= limit):
+                return depth, guess
+        instrumentation.count('worst_case_nodes')
+        self.check_deadline()
+
+        codes = self.get_codes(candidates, guesses)
+        largest = np.max(get_response_weights(codes, np.ones(len(candidates)), self.word_length), axis=1)
+        could_win = np.isin(guesses, candidates)
+        best, best_guess = limit, None
+        for g in np.lexsort((~could_win, largest)):
+            if largest[g] == len(candidates): #Guesses from here on learn nothing
+                break
+            #With a biggest group of one, the next guess finds the answer, otherwise at least two more are needed
+            if 1 + (1 if largest[g] == 1 else 2) >= best:
+                break
+            depth = 1
+            for code, group in self.split(guesses[g], candidates):
+                next_guesses = guesses if self.narrow is None else self.narrow(guesses, guesses[g], code)
+                depth = max(depth, 1 + self.solve(group, best - 1, next_guesses)[0])
+                if depth >= best:
+                    break
+            if depth < best:
+                best, best_guess = depth, guesses[g]
+                if best == 2: #Can't do better than this with more than one candidate
+                    break
+
+        self.memo[key] = (best, best_guess)
+        return best, best_guess
+
+
+def get_worst_case(feedback, candidates, time_budget=DEFAULT_TIME_BUDGET, guesses=None, hard_mode=False):
+    """(guess row, guesses needed in the worst case) for candidate rows of the feedback matrix, or None if not proved in time.
+
+    guesses are the rows allowed as the next guess (every row by default), and
+    in hard mode they are narrowed by each response deeper in the search.
+    """
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    narrow = hard_mode_narrowing(feedback) if hard_mode else None
+    solver = WorstCaseSolver(feedback.matrix, feedback.word_length, guesses=guesses, deadline=deadline, narrow=narrow)
+    try:
+        depth, guess = solver.solve(np.sort(candidates))
+    except SearchTimeout:
+        return None
+    return guess, depth
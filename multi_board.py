@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Multi-board variants (Quordle, Octordle, ...), where every guess is played
+on several boards at once, each hiding its own word.
+
+Guesses are scored against all the unsolved boards in one batched pass: the
+candidates of every board are put side by side, each response code is offset
+by its board, and one bincount per block gives the weight of every (guess,
+board, response). The cost therefore grows with the total number of
+candidates left across boards rather than with the number of boards times
+the dictionary. Two objectives are available: the summed expected
+information over the boards, and the expected number of boards solved (a
+board counts as solved if the guess is its answer, or leaves only one
+candidate for it).
+
+python multi_board.py wordle_dictionary.txt 5 --boards 8
+"""
+
+from wordle_solver import Solver
+from guess_scoring import DEFAULT_MEMORY_BUDGET
+from feedback_matrix import words_to_codes, compute_feedback
+from tqdm import tqdm
+import numpy as np
+import argparse
+
+SUMMED_INFORMATION = 'information'
+BOARDS_SOLVED = 'boards_solved'
+
+
+def get_multi_board_batch_size(n_candidates, n_boards, word_length, memory_budget=DEFAULT_MEMORY_BUDGET):
+    bytes_per_guess = n_candidates * (4 + 8 + 8 + 2 * word_length) + n_boards * 3**word_length * 8 * 3
+    return max(1, int(memory_budget // bytes_per_guess))
+
+def get_board_response_weights(codes, board_offsets, weights, n_boards, word_length, counts=False):
+    """Weight (or number, if counts is set) of the candidates giving each response on each board.
+
+    codes has a column per candidate, across all boards, and board_offsets
+    gives each column's board times the number of responses. The result has
+    shape (len(codes), n_boards, 3**word_length).
+    """
+    n_codes = 3**word_length
+    offsets = codes.astype(np.intp) + board_offsets
+    offsets += (np.arange(len(codes), dtype=np.intp) * (n_boards * n_codes))[:, None]
+    response_weights = np.bincount(offsets.ravel(), weights=None if counts else np.tile(weights, len(codes)), minlength=len(codes) * n_boards * n_codes)
+    return response_weights.reshape(len(codes), n_boards, n_codes)
+
+def get_summed_information(codes, board_offsets, weights, n_boards, word_length):
+    #Weights are normalized within each board, so these are probabilities
+    probabilities = get_board_response_weights(codes, board_offsets, weights, n_boards, word_length)
+    return -1 * np.sum(probabilities * np.log2(np.where(probabilities > 0, probabilities, 1)), axis=(1, 2))
+
+def get_expected_boards_solved(codes, board_offsets, weights, n_boards, word_length):
+    probabilities = get_board_response_weights(codes, board_offsets, weights, n_boards, word_length)
+    counts = get_board_response_weights(codes, board_offsets, weights, n_boards, word_length, counts=True)
+    return np.sum(probabilities * (counts == 1), axis=(1, 2))
+
+OBJECTIVES = {SUMMED_INFORMATION: get_summed_information,
+              BOARDS_SOLVED: get_expected_boards_solved}
+
+def score_boards(guesses, boards, board_weights, word_length, matrix=None, objective=SUMMED_INFORMATION, memory_budget=DEFAULT_MEMORY_BUDGET, progress=True):
+    """Score every guess against all the boards at once.
+
+    boards is a list with the candidates of each board, as feedback matrix
+    rows (or letter code arrays if there is no matrix), guesses likewise, and
+    board_weights the prior weights of each board's candidates.
+    """
+    n_codes = 3**word_length
+    answers = np.concatenate(boards)
+    weights = np.concatenate([w / np.sum(w) for w in board_weights])
+    board_offsets = np.repeat(np.arange(len(boards), dtype=np.intp) * n_codes, [len(b) for b in boards])
+    batch_size = min(get_multi_board_batch_size(len(answers), len(boards), word_length, memory_budget), len(guesses))
+    scores = np.zeros(len(guesses))
+    starts = range(0, len(guesses), batch_size)
+    for start in (tqdm(starts) if progress else starts):
+        if matrix is not None:
+            codes = matrix[np.ix_(guesses[start:start+batch_size], answers)]
+        else:
+            codes = compute_feedback(guesses[start:start+batch_size], answers)
+        scores[start:start+batch_size] = OBJECTIVES[objective](codes, board_offsets, weights, len(boards), word_length)
+    return scores
+
+
+class MultiBoardSolver:
+    """A game on n_boards boards, each a Solver game sharing the same dictionary data."""
+
+    def __init__(self, solver, n_boards):
+        self.solver = solver
+        feedback = solver.load_feedback()
+        if (feedback is not None) and (solver.feedback_rows is None):
+            solver.feedback_rows = feedback.indices(solver.initial_word_list)
+        self.games = [solver.new_game() for b in range(n_boards)]
+        self.solved = [False for b in range(n_boards)]
+
+    @property
+    def active_boards(self):
+        return [b for b in range(len(self.games)) if not self.solved[b]]
+
+    def apply(self, guess, results):
+        """Apply the result on each active board (in order), and return the number of candidates left on each."""
+        for b, result in zip(self.active_boards, results):
+            if result == '*' * len(guess):
+                self.solved[b] = True
+            else:
+                self.games[b].apply(guess, result)
+        return [len(self.games[b].candidate_indices) for b in self.active_boards]
+
+    def suggest(self, k=5, objective=SUMMED_INFORMATION, progress=True):
+        """Top k guesses for the active boards under the objective, and their scores."""
+        games = [self.games[b] for b in self.active_boards]
+        word_list = self.solver.initial_word_list
+        if self.solver.feedback is not None:
+            rows, matrix = self.solver.feedback_rows, self.solver.feedback.matrix
+        else:
+            rows, matrix = words_to_codes(word_list), None
+        boards = [rows[game.candidate_indices] for game in games]
+        board_weights = [game.weights[game.candidate_indices] for game in games]
+        scores = score_boards(rows, boards, board_weights, len(word_list[0]), matrix, objective, progress=progress)
+        #Boost words that could be right on some board slightly, to break ties
+        for game in games:
+            scores[game.candidate_indices] += 0.0001
+        r = np.argsort(-1 * scores, kind='stable')[0:k]
+        return word_list[r], scores[r]
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dict_file")
+    parser.add_argument("word_length", type=int)
+    parser.add_argument("--boards", type=int, default=4)
+    parser.add_argument("--objective", default=SUMMED_INFORMATION, choices=list(OBJECTIVES))
+    parser.add_argument("--frequencies", action="store_true", help="Use the word frequency weights (the .weights.v1.*.npy arrays) as the prior")
+    args = parser.parse_args()
+
+    solver = Solver.from_dictionary(args.dict_file, args.word_length, use_word_frequencies=args.frequencies, use_feedback_matrix=True)
+    game = MultiBoardSolver(solver, args.boards)
+
+    while len(game.active_boards) > 0:
+        print("Remaining words on each unsolved board:", [len(game.games[b].candidate_indices) for b in game.active_boards])
+        suggestions, scores = game.suggest(5, objective=args.objective)
+        print("Top suggested guesses and their scores:")
+        print(suggestions)
+        print(scores)
+        next_guess = input("Enter your guess here:")
+        results = [input("Enter the result on board " + str(b + 1) + " here, -=grey, .=orange, *=green:") for b in game.active_boards]
+        game.apply(next_guess, results)
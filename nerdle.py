@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Nerdle mode: the answers are equations over 15 symbols (the digits, + - * /
+and =) rather than words.
+
+Every equation has a layout, with each digit replaced by 'd' (e.g. 1*1+9=10
+has layout d*d+d=dd), and there are only a few dozen layouts. The position of
+'=' and of every operator, and how many of each operator there are, only
+depend on the layout, so most of what a result says about operators can be
+checked once per layout. The equations are partitioned by layout, and
+applying a result only filters the partitions whose layout is compatible
+with it.
+
+NerdleIndex has the same match_bits/match_mask interface as ConstraintIndex,
+and get_constraint_index picks the right one for a word list.
+"""
+
+from constraint_filter import ConstraintIndex, get_constraints, pack_bits, unpack_bits
+import numpy as np
+
+NERDLE_SYMBOLS = '0123456789+-*/='
+DIGITS = '0123456789'
+
+
+def is_equation_list(words):
+    return (len(words) > 0) and ('=' in words[0]) and all(c in NERDLE_SYMBOLS for c in words[0])
+
+def equations_to_codes(equations):
+    """(n, length) uint8 array of symbol indices into NERDLE_SYMBOLS."""
+    lookup = np.zeros(256, dtype=np.uint8)
+    for i in range(len(NERDLE_SYMBOLS)):
+        lookup[ord(NERDLE_SYMBOLS[i])] = i
+    equations = np.asarray(equations, dtype=str)
+    if len(equations) == 0:
+        return np.zeros((0, 0), dtype=np.uint8)
+    as_bytes = np.frombuffer(equations.astype('S' + str(len(equations[0]))).tobytes(), dtype=np.uint8)
+    return lookup[as_bytes].reshape(len(equations), -1)
+
+def layout_matches(layout, constraints):
+    """False if no equation with this layout could give the result, judging by its operators alone."""
+    if constraints is None:
+        return False
+    greens, not_at, min_counts, max_counts = constraints
+    for position, symbol in greens:
+        if layout[position] != ('d' if symbol in DIGITS else symbol):
+            return False
+    for position, symbol in not_at:
+        if layout[position] == symbol:
+            return False
+    for symbol in min_counts:
+        if (symbol not in DIGITS) and (layout.count(symbol) < min_counts[symbol]):
+            return False
+    for symbol in max_counts:
+        if (symbol not in DIGITS) and (layout.count(symbol) > max_counts[symbol]):
+            return False
+    return True
+
+
+class NerdleIndex:
+    """A ConstraintIndex over the equations grouped by layout.
+
+    Each layout's equations start on a fresh 64 bit block (the gaps are
+    padded), so matching a result only has to AND the blocks of the
+    compatible layouts.
+    """
+
+    def __init__(self, equations):
+        self.words = equations
+        self.n_words = len(equations)
+        self.word_length = len(equations[0]) if len(equations) > 0 else 0
+        self.word_index = {equations[i]: i for i in range(len(equations))}
+        codes = equations_to_codes(equations)
+        layout_symbols = np.where(codes < len(DIGITS), 'd', np.array(list(NERDLE_SYMBOLS))[codes])
+        self.layouts, inverse = np.unique(np.array([''.join(row) for row in layout_symbols]), return_inverse=True)
+        inverse = inverse.ravel()
+        self.layouts = self.layouts.tolist()
+        #slots[i] is the equation held by bit i of the grouped index, or -1 for padding
+        sizes = np.bincount(inverse, minlength=len(self.layouts))
+        n_blocks = -(-sizes // 64)
+        self.partition_blocks = np.concatenate([[0], np.cumsum(n_blocks)])
+        self.slots = np.full(int(self.partition_blocks[-1]) * 64, -1, dtype=np.intp)
+        for p in range(len(self.layouts)):
+            start = self.partition_blocks[p] * 64
+            self.slots[start:start + sizes[p]] = np.where(inverse == p)[0]
+        self.valid = self.slots >= 0
+        padded_words = np.where(self.valid, np.asarray(equations)[self.slots], '=' * self.word_length)
+        self.index = ConstraintIndex(padded_words)
+        self.valid_bits = pack_bits(self.valid)
+        self.all_bits = pack_bits(np.ones(self.n_words, dtype=bool))
+
+    def indices(self, word_list):
+        return np.array([self.word_index[w] for w in word_list], dtype=np.intp)
+
+    def compatible_partitions(self, guess, result):
+        if len(guess) != self.word_length:
+            return []
+        constraints = get_constraints(guess, result)
+        return [p for p in range(len(self.layouts)) if layout_matches(self.layouts[p], constraints)]
+
+    def match_mask(self, guess, result):
+        partitions = self.compatible_partitions(guess, result)
+        mask = np.zeros(self.n_words, dtype=bool)
+        if len(partitions) == 0:
+            return mask
+        blocks = np.concatenate([np.arange(self.partition_blocks[p], self.partition_blocks[p + 1]) for p in partitions])
+        grouped_bits = np.zeros(len(self.valid_bits), dtype=np.uint64)
+        grouped_bits[blocks] = self.index.match_bits(guess, result, blocks=blocks) & self.valid_bits[blocks]
+        return self.ungroup(grouped_bits)
+
+    def ungroup(self, grouped_bits):
+        """Mask over the equations from a bitset over the grouped slots."""
+        mask = np.zeros(self.n_words, dtype=bool)
+        grouped_mask = unpack_bits(grouped_bits, len(self.slots))
+        mask[self.slots[self.valid]] = grouped_mask[self.valid]
+        return mask
+
+    def match_bits(self, guess, result, bits=None):
+        """Packed bitset of the equations (within bits, if given) consistent with the result."""
+        matches = pack_bits(self.match_mask(guess, result))
+        return matches if bits is None else matches & bits
+
+    def hard_mode_bits(self, guess, result, bits=None):
+        """Packed bitset of the equations (within bits, if given) that hard mode still allows as guesses."""
+        allowed = pack_bits(self.ungroup(self.index.hard_mode_bits(guess, result) & self.valid_bits))
+        return allowed if bits is None else allowed & bits
+
+
+def get_constraint_index(words):
+    if is_equation_list(words):
+        return NerdleIndex(words)
+    return ConstraintIndex(words)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Opening books: precomputed suggestions for the first few turns of a game.
+
+A book belongs to one (dictionary, word length, frequency mode). It maps the
+history of a game so far, a tuple of (guess, result) pairs, to the ranked
+suggestions for the next guess, so the common opening positions need no live
+scoring. The root (empty history) holds the full ranking of first guesses,
+later positions hold the top few. Books are written by create_opening_book.py.
+
+Books are stored as .npz arrays. Running this file converts books from the
+older pickle format, e.g.
+python opening_book.py wordle_dictionary.txt.5.freq.book.pkl
+"""
+
+from wordle_dictionary import dictionary_fingerprint
+from feedback_matrix import encode_response, decode_response
+from frequency_weights import weights_fingerprint
+import instrumentation
+import numpy as np
+import pickle
+import sys
+import os
+
+BOOK_VERSION = 3
+
+
+def opening_book_path(dict_file, word_length, use_word_frequencies):
+    mode = "freq" if use_word_frequencies else "uniform"
+    return dict_file + "." + str(word_length) + "." + mode + ".book.npz"
+
+def book_weights_fingerprint(dict_file, word_length, use_word_frequencies):
+    #Books scored with frequencies go stale when the weights change, as well as the dictionary
+    return weights_fingerprint(dict_file, word_length) if use_word_frequencies else ''
+
+def save_opening_book(nodes, dict_file, word_length, use_word_frequencies, depth):
+    """Write the book as plain arrays, so loading it needs no unpickling.
+
+    Each position's history is stored as its guesses and encoded results
+    (padded with '' and -1), and the suggestions of every position are
+    concatenated, with offsets marking where each position's start.
+    """
+    histories = list(nodes)
+    max_length = max([len(history) for history in histories] + [0])
+    history_guesses = np.array([[guess for guess, result in history] + [''] * (max_length - len(history)) for history in histories], dtype='U' + str(word_length)).reshape(len(histories), max_length)
+    history_results = np.array([[encode_response(result) for guess, result in history] + [-1] * (max_length - len(history)) for history in histories], dtype=np.int64).reshape(len(histories), max_length)
+    offsets = np.cumsum([0] + [len(nodes[history][0]) for history in histories])
+    book_file = opening_book_path(dict_file, word_length, use_word_frequencies)
+    with open(book_file + ".tmp", 'wb') as f:
+        np.savez(f,
+                 version=BOOK_VERSION,
+                 fingerprint=dictionary_fingerprint(dict_file),
+                 weights_fingerprint=book_weights_fingerprint(dict_file, word_length, use_word_frequencies),
+                 word_length=word_length,
+                 use_word_frequencies=use_word_frequencies,
+                 depth=depth,
+                 n_words=len(nodes[()][0]),
+                 history_guesses=history_guesses,
+                 history_results=history_results,
+                 offsets=offsets,
+                 words=np.concatenate([np.asarray(nodes[history][0], dtype='U' + str(word_length)) for history in histories]),
+                 scores=np.concatenate([np.asarray(nodes[history][1], dtype=float) for history in histories]))
+    os.replace(book_file + ".tmp", book_file)
+    return load_opening_book(dict_file, word_length, use_word_frequencies)
+
+def load_opening_book(dict_file, word_length, use_word_frequencies):
+    """The book for this game, or None if there isn't an up to date one."""
+    book_file = opening_book_path(dict_file, word_length, use_word_frequencies)
+    if not os.path.exists(book_file):
+        return None
+    with instrumentation.timer('load_opening_book'), np.load(book_file, allow_pickle=False) as data:
+        if (int(data['version']) != BOOK_VERSION) or (str(data['fingerprint']) != dictionary_fingerprint(dict_file)):
+            return None
+        if str(data['weights_fingerprint']) != book_weights_fingerprint(dict_file, word_length, use_word_frequencies):
+            return None
+        words, scores, offsets = data['words'], data['scores'], data['offsets']
+        nodes = dict()
+        for i, (guesses, results) in enumerate(zip(data['history_guesses'].tolist(), data['history_results'].tolist())):
+            history = tuple([(guesses[j], decode_response(results[j], word_length)) for j in range(len(results)) if results[j] >= 0])
+            nodes[history] = (words[offsets[i]:offsets[i + 1]], scores[offsets[i]:offsets[i + 1]])
+        return {'version': BOOK_VERSION,
+                'fingerprint': str(data['fingerprint']),
+                'weights_fingerprint': str(data['weights_fingerprint']),
+                'word_length': int(data['word_length']),
+                'use_word_frequencies': bool(data['use_word_frequencies']),
+                'depth': int(data['depth']),
+                'n_words': int(data['n_words']),
+                'nodes': nodes}
+
+def convert_opening_book_pickle(pickle_file):
+    #Only for books written by the pickle based create_opening_book.py, unpickling is not safe for untrusted files
+    book = pickle.load(open(pickle_file, 'rb'))
+    dict_file = pickle_file.rsplit(".", 4)[0]
+    nodes = {tuple([(str(guess), result) for guess, result in history]): node for history, node in book['nodes'].items()}
+    save_opening_book(nodes, dict_file, book['word_length'], book['use_word_frequencies'], book['depth'])
+    return opening_book_path(dict_file, book['word_length'], book['use_word_frequencies'])
+
+def lookup_opening_book(book, history, k=None):
+    """(words, scores) for the position reached by history, or None if it is not in the book.
+
+    The position must have at least k suggestions stored (k=None asks for
+    the full ranking, which is only stored for the first guess).
+    """
+    if book is None:
+        return None
+    if k is None:
+        k = book['n_words']
+    node = book['nodes'].get(tuple(history))
+    if (node is None) or (len(node[0]) < k):
+        instrumentation.count('opening_book_misses')
+        return None
+    instrumentation.count('opening_book_hits')
+    return node
+
+
+if __name__ == "__main__":
+
+    for pickle_file in sys.argv[1:]:
+        print("Converted", convert_opening_book_pickle(pickle_file))
@@ -17,27 +17,27 @@ import wordle_solver
 import numpy as np
 from tqdm import tqdm
 from wordle_dictionary import get_full_word_list
+from feedback_matrix import load_feedback_matrix
 import pickle
 
 initial_word_list = np.array(get_full_word_list('wordle_dictionary.txt',5))
 
+feedback = load_feedback_matrix('wordle_dictionary.txt',5)
+
 current_word_list = np.copy(initial_word_list)
 
 def optimization(word_list, possibilities, use_log=True):
     expected_information = np.zeros(len(word_list))
     
+    guess_indices = feedback.indices(word_list)
+    possibility_indices = feedback.indices(possibilities)
+    
     for w in range(len(word_list)):
-        response_counts = dict()
-        normalization_factor = 0
-        for r in possibilities:
-            response = wordle_solver.simulate_wordle_response(r, word_list[w])
-            if response in response_counts:
-                response_counts[response] += 1
-            else:
-                response_counts[response] = 1
-            normalization_factor += 1
+        response_counts = np.bincount(feedback.matrix[guess_indices[w]][possibility_indices])
+        response_counts = response_counts[response_counts > 0]
+        normalization_factor = len(possibilities)
 
-        probabilities = np.array(list(response_counts.values())) / normalization_factor
+        probabilities = response_counts / normalization_factor
         if use_log:
             expected_information[w] = -1 * np.sum(probabilities * np.log2(probabilities))
         else:
@@ -63,7 +63,7 @@ def solve(word_list, possibilities, word, use_log, first_guess, second_guesses):
         if guess == word:
             return n_turns
         response = wordle_solver.simulate_wordle_response(word,guess)
-        working_possibilities = wordle_solver.update_word_list(working_possibilities,guess,response)
+        working_possibilities = wordle_solver.update_word_list(working_possibilities,guess,response,feedback=feedback)
         if second_guess:
             if response in second_guesses:
                 guess = second_guesses[response]
@@ -5,7 +5,8 @@ Created on Sun Jan 16 17:04:35 2022
 @author: tobycrisford
 
 This script computes the best first guess for a "two or die" strategy,
-using standard Wordle list.
+using standard Wordle list by default (or any dictionary and word length
+given on the command line).
 
 For this, we assume that the top 10th percentile of words are equally likely to
 be the answer, that the rest are impossible, and maximize our chances of getting
@@ -15,47 +16,26 @@ The result is "tears"
 """
 
 from wordle_dictionary import get_full_word_list
-from tqdm import tqdm
+from feedback_matrix import load_feedback_matrix
+from frequency_weights import load_frequency_weights, weights_to_dict
 import wordle_solver
 import numpy as np
+import argparse
 
-initial_word_list = np.array(get_full_word_list("wordle_dictionary.txt",5))
-
-frequency_file = "wordle_dictionary.txt.5.pkl"
-frequency_dict = wordle_solver.preprocess_word_frequencies(frequency_file, initial_word_list)
-
-expected_next_guess_success = np.zeros(len(initial_word_list))
-
-frequency_threshold = np.percentile(list(frequency_dict.values()), 90)
-
-for w in tqdm(range(len(initial_word_list))):
-    max_weight = dict()
-    total_weight = dict()
-    normalization_factor = 0
-    
-    for solution in initial_word_list:
-        response = wordle_solver.simulate_wordle_response(solution, initial_word_list[w])
-        if frequency_dict[solution] > frequency_threshold:
-            rescaled_freq = 1
-        else:
-            rescaled_freq = 0
-        if response in max_weight:
-            if rescaled_freq > max_weight[response]:
-                max_weight[response] = rescaled_freq
-        else:
-            max_weight[response] = rescaled_freq
-        if response in total_weight:
-            total_weight[response] += rescaled_freq
-        else:
-            total_weight[response] = rescaled_freq
-        normalization_factor += rescaled_freq
-    
-    for response in max_weight:
-        #expected_next_guess_success[w] += ((total_weight[response] / normalization_factor) * (max_weight[response] / total_weight[response]))
-        #Interestingly above commented out formula independent of total_weight values, so can simplify:
-        expected_next_guess_success[w] += (max_weight[response] / normalization_factor)
-        
-ind_order = np.argsort(-1 * expected_next_guess_success)
-
-print(initial_word_list[ind_order[0:5]])
-print(expected_next_guess_success[ind_order[0:5]])
\ No newline at end of file
+parser = argparse.ArgumentParser()
+parser.add_argument("dict_file", nargs="?", default="wordle_dictionary.txt")
+parser.add_argument("word_length", nargs="?", type=int, default=5)
+parser.add_argument("--percentile", type=float, default=90)
+parser.add_argument("--processes", type=int, default=wordle_solver.DEFAULT_PROCESSES)
+args = parser.parse_args()
+
+initial_word_list = np.array(get_full_word_list(args.dict_file, args.word_length))
+
+frequency_dict = weights_to_dict(initial_word_list, load_frequency_weights(args.dict_file, args.word_length))
+
+feedback = load_feedback_matrix(args.dict_file, args.word_length)
+
+suggestions, expected_next_guess_success = wordle_solver.get_two_or_die_suggestions(initial_word_list, initial_word_list, frequency_dict, percentile=args.percentile, feedback=feedback, n_processes=args.processes, k=5)
+
+print(initial_word_list[suggestions])
+print(expected_next_guess_success)
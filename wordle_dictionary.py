@@ -8,22 +8,101 @@ Actual word list used by wordle
 """
 
 #Word lists have been extracted from the Wordle game javascript source code.
-#They need some cleaning, which is done here.
+#They need some cleaning, which is done here once, when the list is compiled
+#into a binary store next to the dictionary file. The store holds every word,
+#sorted, as fixed width uint8 letter codes partitioned by word length, plus an
+#index of (offset, count) for each length, so loading one length only touches
+#that partition of a memory-mapped array. The dictionary's content hash is in
+#the store's file name, so editing the dictionary triggers a recompile.
 
-def get_full_word_list(dict_file, word_length):
+import numpy as np
+import instrumentation
+import hashlib
+import glob
+import os
+
+STORE_VERSION = 1
+
+
+def dictionary_fingerprint(dict_file):
+    with open(dict_file, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()[0:12]
+
+def parse_word_list(dict_file):
 
     with open(dict_file, 'r') as f:
-        raw_text = f.readlines()
+        raw_text = f.read()
         
-    word_list = []
-    for l in raw_text:
-        split_line = l.split('"')
-        for w in split_line:
-            word = w.replace('[','')
-            word = w.replace(',','')
-            if len(word) > 0:
-                word_list.append(word)
-                
-    word_list = [w for w in word_list if len(w) == word_length]
-
-    return list(set(word_list))
\ No newline at end of file
+    #Words are the quoted strings, everything between them is javascript punctuation
+    word_list = [w for w in raw_text.split('"')[1::2] if len(w) > 0]
+
+    return word_list
+
+def store_paths(dict_file):
+    base = dict_file + ".store.v" + str(STORE_VERSION) + "." + dictionary_fingerprint(dict_file)
+    return base + ".npy", base + ".index.npy"
+
+def remove_stale_files(pattern, keep):
+    """Delete the files matching pattern other than keep, leaving other processes' temporary files alone."""
+    for stale in glob.glob(pattern):
+        if (stale not in keep) and (".tmp" not in stale):
+            try:
+                os.remove(stale)
+            except FileNotFoundError: #Another process got there first
+                pass
+
+def temporary_path(path):
+    #One per process, so processes building the same file at once don't clash
+    return path + "." + str(os.getpid()) + ".tmp.npy"
+
+def compile_dictionary(dict_file):
+    instrumentation.count('dictionary_compiles')
+    codes_file, index_file = store_paths(dict_file)
+    remove_stale_files(glob.escape(dict_file) + ".store.v*.npy", (codes_file, index_file))
+
+    words = np.unique(np.array(parse_word_list(dict_file)).astype(bytes))
+    lengths = np.char.str_len(words)
+    max_length = int(np.max(lengths)) if len(words) > 0 else 0
+    index = np.zeros((max_length + 1, 2), dtype=np.int64)
+    partitions = []
+    offset = 0
+    for word_length in range(1, max_length + 1):
+        partition = words[lengths == word_length].astype('S' + str(word_length))
+        partitions.append(np.frombuffer(partition.tobytes(), dtype=np.uint8))
+        index[word_length] = (offset, len(partition))
+        offset += len(partition) * word_length
+
+    np.save(temporary_path(codes_file), np.concatenate(partitions) if len(partitions) > 0 else np.zeros(0, dtype=np.uint8))
+    np.save(temporary_path(index_file), index)
+    os.replace(temporary_path(codes_file), codes_file)
+    os.replace(temporary_path(index_file), index_file)
+
+def load_store_index(dict_file):
+    codes_file, index_file = store_paths(dict_file)
+    if not (os.path.exists(codes_file) and os.path.exists(index_file)):
+        compile_dictionary(dict_file)
+    return np.load(index_file)
+
+def get_word_lengths(dict_file):
+    index = load_store_index(dict_file)
+    return [word_length for word_length in range(1, len(index)) if index[word_length][1] > 0]
+
+def load_word_codes(dict_file, word_length):
+    """Memory-mapped (n_words, word_length) uint8 array of the sorted words of this length."""
+    index = load_store_index(dict_file)
+    codes_file, index_file = store_paths(dict_file)
+    if (word_length < 1) or (word_length >= len(index)):
+        return np.zeros((0, max(word_length, 0)), dtype=np.uint8)
+    offset, count = index[word_length]
+    flat = np.load(codes_file, mmap_mode='r')
+    return flat[offset:offset + count * word_length].reshape(count, word_length)
+
+def codes_to_words(codes):
+    if len(codes) == 0:
+        return np.array([], dtype=str)
+    return np.ascontiguousarray(codes).view('S' + str(codes.shape[1])).ravel().astype(str)
+
+def get_full_word_list(dict_file, word_length):
+
+    with instrumentation.timer('load_word_list'):
+        return codes_to_words(load_word_codes(dict_file, word_length)).tolist()
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Local HTTP/JSON service for the solver, e.g.
+python wordle_service.py --games wordle_dictionary.txt:5 wordle_unlimited_dictionary.txt:6 --port 8080
+
+Endpoints (all POST, JSON in and out):
+    /suggest     {"game": "wordle_dictionary.txt:5", "history": [["tares", "-.--."]], "k": 5, "brute_force": true, "hard_mode": false}
+    /filter      {"game": ..., "history": ..., "limit": 100}
+    /candidates  {"game": ..., "history": ..., "k": 5}
+    /debrief     {"game": ..., "answer": "cigar", "guesses": ["tares", "cigar"]}
+    /batch       {"requests": [{"endpoint": "suggest", ...}, ...]}
+and GET /health.
+
+Dictionaries, frequencies, feedback matrices, opening books and constraint
+indexes are loaded once at startup and only read afterwards, so every worker
+thread shares them. Requests are parsed on an asyncio event loop, and the
+scoring runs in a thread pool so the loop keeps serving. Identical requests
+that arrive while one is being computed wait for that result rather than
+computing it again, and /batch runs many requests concurrently through the
+same path.
+"""
+
+from wordle_solver import Solver
+from debrief import DebriefEngine
+from nerdle import get_constraint_index
+from frequency_weights import has_frequency_weights
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import argparse
+import asyncio
+import json
+
+MAX_BODY_SIZE = 2**20
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class RequestError(Exception):
+    pass
+
+
+class ServiceState:
+    """Solvers (and debrief engines) for each game, keyed by "dict_file:word_length"."""
+
+    def __init__(self, games, use_feedback_matrix=True):
+        self.solvers = dict()
+        self.debrief_engines = dict()
+        self.symbols = dict()
+        for game in games:
+            dict_file, word_length = game.rsplit(":", 1)
+            use_word_frequencies = has_frequency_weights(dict_file, int(word_length))
+            solver = Solver.from_dictionary(dict_file, int(word_length), use_word_frequencies=use_word_frequencies, use_feedback_matrix=use_feedback_matrix, lazy_feedback=use_feedback_matrix)
+            #Build everything games would otherwise build lazily, so new games share it
+            if solver.feedback is not None:
+                solver.feedback_rows = solver.feedback.indices(solver.initial_word_list)
+            solver.constraint_index = get_constraint_index(solver.initial_word_list)
+            self.solvers[game] = solver
+            self.symbols[game] = set("".join(solver.initial_word_list.tolist()))
+            self.debrief_engines[game] = DebriefEngine(solver)
+
+    def get_solver(self, request):
+        game = request.get('game')
+        if game not in self.solvers:
+            raise RequestError("Unknown game " + repr(game) + ", expected one of " + ", ".join(self.solvers))
+        return self.solvers[game]
+
+    def get_count(self, request, name, default, minimum):
+        value = request.get(name, default)
+        if value is None:
+            return None
+        if isinstance(value, bool) or not isinstance(value, int) or (value < minimum):
+            raise RequestError(name + " should be a whole number of at least " + str(minimum))
+        return value
+
+    def check_word(self, request, word):
+        """The word in lower case, if it has the game's length and only the game's symbols."""
+        solver = self.get_solver(request)
+        word = str(word).lower()
+        if (len(word) != len(solver.initial_word_list[0])) or any(c not in self.symbols[request['game']] for c in word):
+            raise RequestError("Bad word " + repr(word) + " for game " + request['game'])
+        return word
+
+    def play(self, request):
+        game = self.get_solver(request).new_game()
+        game.hard_mode = bool(request.get('hard_mode', False))
+        for entry in request.get('history', []):
+            if (not isinstance(entry, (list, tuple))) or (len(entry) != 2):
+                raise RequestError("History entries should be [guess, result] pairs")
+            guess, result = self.check_word(request, entry[0]), str(entry[1])
+            if (len(result) != len(guess)) or any(c not in '-.*' for c in result):
+                raise RequestError("Bad history entry " + repr(entry))
+            game.apply(guess, result)
+        return game
+
+    def suggest(self, request):
+        game = self.play(request)
+        suggestions, info_scores = game.suggest(self.get_count(request, 'k', 5, 1), brute_force=bool(request.get('brute_force', True)), n_processes=1, progress=False)
+        return {'suggestions': suggestions.tolist(), 'information': np.asarray(info_scores, dtype=float).tolist()}
+
+    def filter(self, request):
+        game = self.play(request)
+        limit = self.get_count(request, 'limit', None, 0)
+        words = game.current_word_list if limit is None else game.current_word_list[0:limit]
+        return {'remaining': int(len(game.candidate_indices)), 'entropy': float(game.entropy()), 'words': words.tolist()}
+
+    def candidates(self, request):
+        game = self.play(request)
+        words, probabilities = game.candidates(self.get_count(request, 'k', 5, 1))
+        return {'words': words.tolist(), 'probabilities': probabilities.tolist()}
+
+    def debrief(self, request):
+        answer = self.check_word(request, request.get('answer', ''))
+        if not isinstance(request.get('guesses', []), list):
+            raise RequestError("guesses should be a list of words")
+        guesses = [self.check_word(request, guess) for guess in request.get('guesses', [])]
+        turns = self.debrief_engines[request['game']].debrief(answer, guesses)
+        return [{key: (turn[key].tolist() if isinstance(turn[key], np.ndarray) else (turn[key].item() if isinstance(turn[key], np.generic) else turn[key])) for key in turn} for turn in turns]
+
+
+ENDPOINTS = ('suggest', 'filter', 'candidates', 'debrief')
+
+
+class WordleService:
+
+    def __init__(self, state, n_workers=4):
+        self.state = state
+        self.executor = ThreadPoolExecutor(n_workers)
+        self.in_flight = dict()
+
+    async def handle(self, endpoint, request):
+        """Result of one request, sharing the computation with identical requests already in flight."""
+        if endpoint not in ENDPOINTS:
+            raise RequestError("Unknown endpoint " + repr(endpoint))
+        if not isinstance(request, dict):
+            raise RequestError("Requests should be JSON objects")
+        key = (endpoint, json.dumps(request, sort_keys=True))
+        if key not in self.in_flight:
+            loop = asyncio.get_running_loop()
+            self.in_flight[key] = loop.run_in_executor(self.executor, getattr(self.state, endpoint), request)
+            self.in_flight[key].add_done_callback(lambda future: self.in_flight.pop(key, None))
+        return await asyncio.shield(self.in_flight[key])
+
+    async def handle_batch(self, request):
+        requests = request.get('requests') if isinstance(request, dict) else None
+        if not isinstance(requests, list):
+            raise RequestError("Batches should have a list of requests")
+        async def handle_one(r):
+            try:
+                return {'result': await self.handle(r.get('endpoint') if isinstance(r, dict) else None, r)}
+            except RequestError as e:
+                return {'error': str(e)}
+            except Exception as e:
+                return {'error': "Internal error: " + repr(e)}
+        return {'responses': await asyncio.gather(*[handle_one(r) for r in requests])}
+
+    async def route(self, method, path, body):
+        if (method == 'GET') and (path == '/health'):
+            return 200, {'status': 'ok', 'games': list(self.state.solvers)}
+        if method != 'POST':
+            return 404, {'error': "Not found"}
+        try:
+            request = json.loads(body.decode('utf-8') or '{}')
+        except ValueError:
+            return 400, {'error': "Body is not valid JSON"}
+        try:
+            if path == '/batch':
+                return 200, await self.handle_batch(request)
+            if path.lstrip('/') in ENDPOINTS:
+                return 200, await self.handle(path.lstrip('/'), request)
+        except RequestError as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': "Internal error: " + repr(e)}
+        return 404, {'error': "Not found"}
+
+    async def serve_connection(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            headers = dict()
+            while True:
+                line = (await reader.readline()).decode('latin-1')
+                if line in ('\r\n', '\n', ''):
+                    break
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+            if len(request_line) < 2:
+                return
+            length = int(headers.get('content-length', 0))
+            if length > MAX_BODY_SIZE:
+                status, response = 413, {'error': "Request too large"}
+            else:
+                body = await reader.readexactly(length)
+                status, response = await self.route(request_line[0], request_line[1].split('?')[0], body)
+            payload = json.dumps(response).encode('utf-8')
+            writer.write(("HTTP/1.1 " + str(status) + " " + STATUS_TEXT[status] + "\r\nContent-Type: application/json\r\nContent-Length: " + str(len(payload)) + "\r\nConnection: close\r\n\r\n").encode('latin-1') + payload)
+            await writer.drain()
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.serve_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", nargs="+", default=["wordle_dictionary.txt:5"], help="dict_file:word_length for each game to serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=4, help="Threads used for scoring")
+    parser.add_argument("--no-feedback-matrix", action="store_true", help="Score without the precomputed feedback matrices")
+    args = parser.parse_args()
+
+    service = WordleService(ServiceState(args.games, use_feedback_matrix=not args.no_feedback_matrix), args.workers)
+    print("Serving", ", ".join(args.games), "on http://" + args.host + ":" + str(args.port))
+    asyncio.run(service.serve(args.host, args.port))
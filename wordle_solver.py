@@ -7,33 +7,34 @@ Created on Mon Jan 10
 
 import numpy as np
 from wordle_dictionary import get_full_word_list
-from tqdm import tqdm
-import os
-import pickle
+from feedback_matrix import load_feedback_matrix, encode_response, words_to_codes
+from guess_scoring import get_expected_information, get_top_expected_information, rank_scores, get_weights, score_rows, get_next_guess_success, get_response_max_weights, DEFAULT_MEMORY_BUDGET, DEFAULT_PROCESSES
+from opening_book import load_opening_book, lookup_opening_book
+from constraint_filter import unpack_bits, ALPHABET_SIZE
+from nerdle import get_constraint_index
+from frequency_weights import load_frequency_weights, has_frequency_weights, weights_to_dict
+from lookahead import get_lookahead_suggestion, EXPECTED_GUESSES, WIN_PROBABILITY
+from minimax import get_minimax_suggestions, get_worst_case, DEFAULT_TIME_BUDGET
+import instrumentation
+import argparse
 
 use_brute_force = False
 
-def fetch_count(count_dict, letter):
-    r = count_dict.get(letter)
-    if r is None:
-        return 0
-    else:
-        return r
-
 def get_suggestions(word_list, green_counts, orange_counts):
     
+    codes = words_to_codes(word_list)
     information = np.zeros(len(word_list))
-    for w in range(len(word_list)):
-        for l in range(len(word_list[w])):
-            green_prob = fetch_count(green_counts[l], word_list[w][l])
-            orange_prob = fetch_count(orange_counts[l], word_list[w][l])
-            grey_prob = 1 - (green_prob + orange_prob)
-            if word_list[w][l] in word_list[w][0:l]: #Heuristic to deal with repeated letters where independence assumption badly violated
-                orange_prob = 0
-                grey_prob = 1 - green_prob
-            for p in (green_prob, orange_prob, grey_prob):
-                if p > 0: #Greater than necessary as sometimes grey_prob=0 becomes grey_prob~ -1 x 10^-13
-                    information[w] += - p * np.log2(p)
+    for l in range(codes.shape[1]):
+        green_prob = green_counts[l][codes[:, l]]
+        orange_prob = orange_counts[l][codes[:, l]]
+        grey_prob = 1 - (green_prob + orange_prob)
+        #Heuristic to deal with repeated letters where independence assumption badly violated
+        repeated = np.any(codes[:, 0:l] == codes[:, l:l+1], axis=1)
+        orange_prob = np.where(repeated, 0, orange_prob)
+        grey_prob = np.where(repeated, 1 - green_prob, grey_prob)
+        for p in (green_prob, orange_prob, grey_prob):
+            #Greater than necessary as sometimes grey_prob=0 becomes grey_prob~ -1 x 10^-13
+            information += np.where(p > 0, -1 * p * np.log2(np.where(p > 0, p, 1)), 0)
                     
     r = np.argsort(-1 * information)
     
@@ -42,6 +43,7 @@ def get_suggestions(word_list, green_counts, orange_counts):
 
 def simulate_wordle_response(word, guess):
     
+    instrumentation.count('simulate_calls')
     response = ['-' for i in range(len(guess))]
     word_letters = dict()
     for letter in word:
@@ -68,7 +70,18 @@ def simulate_wordle_response(word, guess):
     
         
 
-def update_word_list(word_list, guess, result):
+def update_word_list(word_list, guess, result, feedback=None, constraint_index=None):
+    
+    with instrumentation.timer('filter'):
+        return _update_word_list(word_list, guess, result, feedback, constraint_index)
+
+def _update_word_list(word_list, guess, result, feedback=None, constraint_index=None):
+    
+    if (feedback is not None) and (guess in feedback):
+        return word_list[feedback.responses(guess, word_list) == encode_response(result)]
+    
+    if constraint_index is not None:
+        return word_list[constraint_index.match_mask(guess, result)[constraint_index.indices(word_list)]]
     
     to_keep = np.full(len(word_list), True)
     
@@ -78,145 +91,357 @@ def update_word_list(word_list, guess, result):
     return word_list[to_keep]
 
 def create_counts(word_list):
-    
-    word_length = len(word_list[0])
-    green_counts = [dict() for i in range(word_length)]
-    orange_counts = [dict() for i in range(word_length)]
-    
-    for word in word_list:
-        
-        unique_letters = set(word)
-        for l in range(len(word)):
-            if word[l] in green_counts[l]:
-                green_counts[l][word[l]] += 1 / len(word_list)
-            else:
-                green_counts[l][word[l]] = 1 / len(word_list)
-            for ul in unique_letters:
-                if ul in orange_counts[l]:
-                    orange_counts[l][ul] += 1 / len(word_list)
-                else:
-                    orange_counts[l][ul] = 1 / len(word_list)
-            orange_counts[l][word[l]] += -1 / len(word_list) #Didn't want to count this position
+    """Fraction of words with each letter (by byte value) green or orange in each position.
+
+    Returns two arrays of shape (word_length, ALPHABET_SIZE).
+    """
+    codes = words_to_codes(word_list)
+    n_words, word_length = codes.shape
+    green_counts = np.zeros((word_length, ALPHABET_SIZE))
+    for l in range(word_length):
+        green_counts[l] = np.bincount(codes[:, l], minlength=ALPHABET_SIZE)
+    contains = np.zeros((n_words, ALPHABET_SIZE), dtype=bool)
+    contains[np.arange(n_words)[:, None], codes] = True
+    #A letter is orange in a position for words that contain it, but not in that position
+    orange_counts = np.sum(contains, axis=0)[None, :] - green_counts
             
-    return (green_counts, orange_counts)
+    return (green_counts / n_words, orange_counts / n_words)
 
-#Can clearly speed the brute force method up a lot while keeping basic structure
-def get_suggestions_brutish_force(word_list, possibilities, frequency_dict):
+def get_suggestions_brutish_force(word_list, possibilities, frequency_dict, feedback=None, memory_budget=DEFAULT_MEMORY_BUDGET, n_processes=DEFAULT_PROCESSES, progress=True, k=None, exhaustive=False):
     
-    expected_information = np.zeros(len(word_list))
-    
-    for w in tqdm(range(len(word_list))):
-        response_counts = dict()
-        normalization_factor = 0
-        for r in possibilities:
-            response = simulate_wordle_response(r, word_list[w])
-            if response in response_counts:
-                response_counts[response] += frequency_dict[r]
-            else:
-                response_counts[response] = frequency_dict[r]
-            normalization_factor += frequency_dict[r]
-
-        probabilities = np.array(list(response_counts.values())) / normalization_factor
-        expected_information[w] = -1 * np.sum(probabilities * np.log2(probabilities))
+    #Boost possible words slightly to break ties as these give prob of premature victory
+    boost = 0.0001 * np.isin(word_list, possibilities)
     
-    possibility_set = set(possibilities)
+    if (k is not None) and (not exhaustive):
+        return get_top_expected_information(word_list, possibilities, frequency_dict, k, feedback=feedback, boost=boost, memory_budget=memory_budget, n_processes=n_processes, progress=progress)
     
-    for w in range(len(word_list)): #Boost possible words slightly to break ties as these give prob of premature victory
-        if word_list[w] in possibility_set:
-            expected_information[w] += 0.0001
+    expected_information = get_expected_information(word_list, possibilities, frequency_dict, feedback=feedback, memory_budget=memory_budget, progress=progress, n_processes=n_processes)
+    expected_information += boost
                        
-    r = np.argsort(-1 * expected_information)
+    r = rank_scores(expected_information, None if k is None else max(k, 0))
     
     return (r, expected_information[r])
 
-def get_entropy_of_words_remaining(word_list, frequency_dict):
-    probabilities = [0 for w in word_list] #Dont convert until numpy until later because need more precision
-    normalization_factor = 0
-    for w in range(len(word_list)):
-        probabilities[w] += frequency_dict[word_list[w]]
-        normalization_factor += frequency_dict[word_list[w]]
-    probabilities = np.array([p / normalization_factor for p in probabilities])
-    probabilities = probabilities[probabilities != 0] #Some tiny values get rounded to 0 by numpy so just filter them out
-    return -1 * np.sum(probabilities * np.log2(probabilities))
-
-def get_candidate_word_probs(word_list, frequency_dict):
-    probabilities = [0 for w in word_list]
-    normalization_factor = 0
-    for w in range(len(word_list)):
-        probabilities[w] += frequency_dict[word_list[w]]
-        normalization_factor += frequency_dict[word_list[w]]
-    probabilities = np.array([p / normalization_factor for p in probabilities])
+def get_two_or_die_suggestions(word_list, possibilities, frequency_dict, percentile=90, feedback=None, memory_budget=DEFAULT_MEMORY_BUDGET, n_processes=DEFAULT_PROCESSES, progress=True, k=None):
+    
+    #Words above the percentile of all frequencies are treated as equally likely and the rest as impossible
+    #Each guess is scored by the probability of then getting the answer with the next guess
+    threshold = np.percentile(list(frequency_dict.values()), percentile)
+    weights = (get_weights(possibilities, frequency_dict) > threshold).astype(float)
+    if np.sum(weights) == 0:
+        weights = np.ones(len(possibilities))
+    
+    if feedback is not None:
+        guesses, answers, matrix, matrix_path = feedback.indices(word_list), feedback.indices(possibilities), feedback.matrix, feedback.path
+    else:
+        guesses, answers, matrix, matrix_path = words_to_codes(word_list), words_to_codes(possibilities), None, None
+    success = score_rows(guesses, answers, weights, len(word_list[0]), matrix, matrix_path, memory_budget, progress, n_processes, objective=get_next_guess_success, reduction=get_response_max_weights)
+    
+    r = np.argsort(-1 * success, kind='stable')[0:k]
+    
+    return (r, success[r])
+
+def get_candidate_word_probs(word_list, frequency_dict, k=None, weights=None):
+    """Indices of the k most likely words in word_list, and their probabilities.
+
+    weights, if given, are the frequencies of word_list in order.
+    """
+    if weights is None:
+        weights = get_weights(word_list, frequency_dict)
+    probabilities = np.asarray(weights, dtype=float) / np.sum(weights)
     
-    r = np.argsort(-1 * probabilities)
+    if (k is not None) and (k < len(probabilities)):
+        r = np.argpartition(-1 * probabilities, k - 1)[0:k]
+        r = r[np.argsort(-1 * probabilities[r])]
+    else:
+        r = np.argsort(-1 * probabilities)
     
     return r, probabilities[r]
 
-def preprocess_word_frequencies(freq_file, word_list):
-    frequency_dict = pickle.load(open(freq_file,'rb'))
-    freqs = frequency_dict.values()
-    max_freq = max(freqs)
-    min_freq = min(freqs)
-    for w in frequency_dict:
-        frequency_dict[w] = frequency_dict[w] / max_freq
-    for w in word_list:
-        if not (w in frequency_dict):
-            frequency_dict[w] = min_freq / max_freq
-            
-    return frequency_dict
+
+class Solver:
+    """State of one game, built on shared dictionary data.
+
+    The word list, frequencies, weights, feedback matrix and opening book are
+    only read, so new_game() can hand out many independent games that share
+    them. The remaining candidates are held as indices into initial_word_list,
+    and results for the current turn are cached until the next apply().
+
+    In hard mode, guesses have to keep greens in place and use every revealed
+    letter again. The guesses still allowed are held as indices too, narrowed
+    after each result, and suggestions only score those.
+
+    Without a feedback matrix, one is loaded from dict_file the first time
+    it's needed, unless lazy_feedback is off.
+    """
+
+    def __init__(self, initial_word_list, frequency_dict, feedback=None, weights=None, dict_file=None, opening_book=None, hard_mode=False, lazy_feedback=True):
+        self.initial_word_list = initial_word_list
+        self.frequency_dict = frequency_dict
+        self.feedback = feedback
+        self.dict_file = dict_file
+        self.lazy_feedback = lazy_feedback
+        self.opening_book = opening_book
+        if weights is None:
+            weights = np.array([frequency_dict[w] for w in initial_word_list], dtype=float)
+        self.weights = weights
+        self.feedback_rows = None
+        self.constraint_index = None
+        self.candidate_indices = np.arange(len(initial_word_list))
+        self.hard_mode = hard_mode
+        self.guess_indices = np.arange(len(initial_word_list))
+        self.history = []
+        self.turn_cache = dict()
+
+    @classmethod
+    def from_dictionary(cls, dict_file, word_length, use_word_frequencies=False, use_feedback_matrix=False, hard_mode=False, lazy_feedback=True):
+        initial_word_list = np.array(get_full_word_list(dict_file, word_length))
+        weights = None
+        if use_word_frequencies:
+            weights = load_frequency_weights(dict_file, word_length)
+            if weights is None:
+                raise FileNotFoundError("No word frequencies for " + dict_file + " with length " + str(word_length))
+            frequency_dict = weights_to_dict(initial_word_list, weights)
+        else:
+            frequency_dict = {w: 1 for w in initial_word_list}
+        feedback = load_feedback_matrix(dict_file, word_length) if use_feedback_matrix else None
+        opening_book = load_opening_book(dict_file, word_length, use_word_frequencies)
+        return cls(initial_word_list, frequency_dict, feedback=feedback, weights=weights, dict_file=dict_file, opening_book=opening_book, hard_mode=hard_mode, lazy_feedback=lazy_feedback)
+
+    def new_game(self):
+        #Call load_feedback() first if the new games should share the feedback matrix
+        game = Solver(self.initial_word_list, self.frequency_dict, feedback=self.feedback, weights=self.weights, dict_file=self.dict_file, opening_book=self.opening_book, hard_mode=self.hard_mode, lazy_feedback=self.lazy_feedback)
+        game.feedback_rows = self.feedback_rows
+        game.constraint_index = self.constraint_index
+        return game
+
+    def fork(self):
+        """A new game in the same position as this one."""
+        game = self.new_game()
+        game.candidate_indices = self.candidate_indices
+        game.guess_indices = self.guess_indices
+        game.history = list(self.history)
+        return game
+
+    def load_feedback(self):
+        if (self.feedback is None) and self.lazy_feedback and (self.dict_file is not None):
+            self.feedback = load_feedback_matrix(self.dict_file, len(self.initial_word_list[0]))
+        return self.feedback
+
+    @property
+    def current_word_list(self):
+        return self.initial_word_list[self.candidate_indices]
+
+    @property
+    def guess_list(self):
+        return self.initial_word_list[self.guess_indices]
+
+    def apply(self, guess, result):
+        with instrumentation.timer('filter'):
+            return self._apply(guess, result)
+
+    def _apply(self, guess, result):
+        if (self.feedback is not None) and (guess in self.feedback):
+            if self.feedback_rows is None:
+                self.feedback_rows = self.feedback.indices(self.initial_word_list)
+            responses = self.feedback.matrix[self.feedback.word_index[guess]][self.feedback_rows[self.candidate_indices]]
+            to_keep = responses == encode_response(result)
+        else:
+            if self.constraint_index is None:
+                self.constraint_index = get_constraint_index(self.initial_word_list)
+            to_keep = unpack_bits(self.constraint_index.match_bits(guess, result), len(self.initial_word_list))[self.candidate_indices]
+        self.candidate_indices = self.candidate_indices[to_keep]
+        if self.hard_mode:
+            if self.constraint_index is None:
+                self.constraint_index = get_constraint_index(self.initial_word_list)
+            allowed = unpack_bits(self.constraint_index.hard_mode_bits(guess, result), len(self.initial_word_list))
+            self.guess_indices = self.guess_indices[allowed[self.guess_indices]]
+        self.history.append((guess, result))
+        self.turn_cache = dict()
+        return len(self.candidate_indices)
+
+    def entropy(self):
+        instrumentation.count('turn_cache_hits' if 'entropy' in self.turn_cache else 'turn_cache_misses')
+        if 'entropy' not in self.turn_cache:
+            probabilities = self.weights[self.candidate_indices] / np.sum(self.weights[self.candidate_indices])
+            probabilities = probabilities[probabilities != 0]
+            self.turn_cache['entropy'] = -1 * np.sum(probabilities * np.log2(probabilities))
+        return self.turn_cache['entropy']
+
+    def candidates(self, k=5):
+        """Most likely answers and their probabilities."""
+        key = ('candidates', k)
+        instrumentation.count('turn_cache_hits' if key in self.turn_cache else 'turn_cache_misses')
+        if key not in self.turn_cache:
+            r, probabilities = get_candidate_word_probs(self.current_word_list, self.frequency_dict, k, weights=self.weights[self.candidate_indices])
+            self.turn_cache[key] = (self.candidate_indices[r], probabilities)
+        indices, probabilities = self.turn_cache[key]
+        return self.initial_word_list[indices], probabilities
+
+    def suggest(self, k=5, brute_force=True, n_processes=DEFAULT_PROCESSES, progress=True, exhaustive=False):
+        """Guesses expected to provide the most information, and that information in bits.
+
+        The brute force method considers every word as a guess, the letter by
+        letter approximation only considers the remaining candidates. Brute
+        force results come from the opening book when the position is in it,
+        and otherwise only guesses that could make the top k are scored,
+        unless exhaustive is set. Pass k=None for the full ranking.
+        """
+        k = None if k is None else max(k, 0)
+        key = ('suggest', brute_force) if (k is None) or exhaustive or (not brute_force) else ('suggest', brute_force, k)
+        instrumentation.count('turn_cache_hits' if key in self.turn_cache else 'turn_cache_misses')
+        if brute_force and (key not in self.turn_cache) and ((not self.hard_mode) or (len(self.history) == 0)):
+            #The book's later turns were scored over every guess, so hard mode only uses its first
+            book_entry = lookup_opening_book(self.opening_book, self.history, k)
+            if book_entry is not None:
+                return book_entry[0][0:k], book_entry[1][0:k]
+        if key not in self.turn_cache:
+            current_word_list = self.current_word_list
+            if brute_force:
+                guess_list = self.guess_list
+                suggestions, info_scores = get_suggestions_brutish_force(guess_list, current_word_list, self.frequency_dict, feedback=self.load_feedback(), n_processes=n_processes, progress=progress, k=None if exhaustive else k)
+                self.turn_cache[key] = (guess_list[suggestions], info_scores)
+            else:
+                green_counts, orange_counts = create_counts(current_word_list)
+                suggestions, info_scores = get_suggestions(current_word_list, green_counts, orange_counts)
+                self.turn_cache[key] = (current_word_list[suggestions], info_scores)
+        words, info_scores = self.turn_cache[key]
+        return words[0:k], info_scores[0:k]
+
+    def two_or_die(self, k=5, percentile=90, n_processes=DEFAULT_PROCESSES, progress=True):
+        """Guesses giving the best chance of getting the answer with the guess after, and that chance.
+
+        Words above the percentile of frequencies count as equally likely, and
+        the rest as impossible.
+        """
+        key = ('two_or_die', percentile)
+        if key not in self.turn_cache:
+            guess_list = self.guess_list
+            suggestions, success = get_two_or_die_suggestions(guess_list, self.current_word_list, self.frequency_dict, percentile=percentile, feedback=self.load_feedback(), n_processes=n_processes, progress=progress)
+            self.turn_cache[key] = (guess_list[suggestions], success)
+        words, success = self.turn_cache[key]
+        return words[0:k], success[0:k]
+
+    def minimax(self, k=5, n_processes=DEFAULT_PROCESSES, progress=True):
+        """Guesses leaving the smallest biggest group of remaining words, and the size of that group."""
+        key = ('minimax',)
+        if key not in self.turn_cache:
+            guess_list = self.guess_list
+            suggestions, largest = get_minimax_suggestions(guess_list, self.current_word_list, feedback=self.load_feedback(), n_processes=n_processes, progress=progress)
+            self.turn_cache[key] = (guess_list[suggestions], largest)
+        words, largest = self.turn_cache[key]
+        return words[0:k], largest[0:k]
+
+    def worst_case(self, time_budget=DEFAULT_TIME_BUDGET):
+        """(guess, guesses needed) guaranteed to find the answer whatever it is, including the guess itself.
+
+        None if the search can't prove it within time_budget seconds, which
+        usually means more than a couple of dozen words remain. Needs the
+        feedback matrix.
+        """
+        key = ('worst_case',)
+        if key not in self.turn_cache:
+            feedback = self.load_feedback()
+            if feedback is None:
+                raise ValueError("Worst case search needs the feedback matrix")
+            if self.feedback_rows is None:
+                self.feedback_rows = feedback.indices(self.initial_word_list)
+            guesses = self.feedback_rows[self.guess_indices] if self.hard_mode else None
+            result = get_worst_case(feedback, self.feedback_rows[self.candidate_indices], time_budget, guesses=guesses, hard_mode=self.hard_mode)
+            if result is None:
+                return None #Might finish with more time, so not cached
+            self.turn_cache[key] = (feedback.words[result[0]], result[1])
+        return self.turn_cache[key]
+
+    def lookahead(self, objective=EXPECTED_GUESSES, max_depth=3, beam_width=8, time_budget=None, max_turns=6):
+        """Best guess from a depth limited search, with its value and the depth searched.
+
+        The value is the expected number of guesses still needed, or the
+        probability of winning within max_turns. With a time_budget (in
+        seconds), the best guess from the deepest search finished in time is
+        returned. Needs the feedback matrix.
+        """
+        key = ('lookahead', objective, max_depth, beam_width, max_turns)
+        if key not in self.turn_cache:
+            feedback = self.load_feedback()
+            if feedback is None:
+                raise ValueError("Lookahead needs the feedback matrix")
+            if self.feedback_rows is None:
+                self.feedback_rows = feedback.indices(self.initial_word_list)
+            row_weights = np.zeros(len(feedback.words))
+            row_weights[self.feedback_rows] = self.weights
+            guesses = self.feedback_rows[self.guess_indices] if self.hard_mode else None
+            result = get_lookahead_suggestion(feedback, row_weights, self.feedback_rows[self.candidate_indices], objective=objective, max_depth=max_depth, beam_width=beam_width, time_budget=time_budget, turns_left=max_turns - len(self.history), guesses=guesses, hard_mode=self.hard_mode)
+            if time_budget is not None:
+                return result #Depends on how much time there was, so not cached
+            self.turn_cache[key] = result
+        return self.turn_cache[key]
 
 
 if __name__ == "__main__":
 
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, default=DEFAULT_PROCESSES, help="Number of processes used for brute force scoring (default from WORDLE_PROCESSES, or 1)")
+    parser.add_argument("--exhaustive", action="store_true", help="Score every guess rather than pruning those that can't make the top suggestions")
+    parser.add_argument("--lookahead", type=float, default=None, metavar="SECONDS", help="Also suggest a guess from a lookahead search with this time budget")
+    parser.add_argument("--trace", nargs="?", const="", default=None, metavar="FILE", help="Print where the time goes each turn, and write the trace as JSON to FILE if given (or set WORDLE_TRACE)")
+    parser.add_argument("--hard", action="store_true", help="Hard mode, only suggest guesses that reuse every revealed letter")
+    parser.add_argument("--minimax", action="store_true", help="Also suggest guesses with the smallest worst case, for adversarial games like Absurdle")
+    parser.add_argument("--objective", default=EXPECTED_GUESSES, choices=[EXPECTED_GUESSES, WIN_PROBABILITY], help="What the lookahead search optimizes")
+    args = parser.parse_args()
+    if args.trace is not None:
+        instrumentation.enable(args.trace if args.trace != "" else None)
+
     list_options = {'wordle': 'wordle_dictionary.txt', 'unlimited': 'wordle_unlimited_dictionary.txt', 'nerdle': 'nerdle_dictionary.txt'}
     
     list_choice = input("Please specify which game you are playing, 'wordle' or 'unlimited' or 'nerdle'?")
     
     length_choice = input("Which length of word are you playing?:")
     
-    initial_word_list = np.array(get_full_word_list(list_options[list_choice], int(length_choice)))
-    
-    current_word_list = np.copy(initial_word_list)
-    
-    frequency_file = list_options[list_choice] + "." + length_choice + ".pkl"
     use_word_frequencies = 'n'
-    if os.path.exists(frequency_file):
+    if has_frequency_weights(list_options[list_choice], int(length_choice)):
         use_word_frequencies = input("Would you like to make use of word frequencies from google books?(y/n)")
-    if use_word_frequencies == 'y':
-        frequency_dict = preprocess_word_frequencies(frequency_file, initial_word_list)
-    else:
-        frequency_dict = dict()
-        for w in initial_word_list:
-           frequency_dict[w] = 1
+    
+    solver = Solver.from_dictionary(list_options[list_choice], int(length_choice), use_word_frequencies == 'y', hard_mode=args.hard)
     
     while True:
         
-        (green_counts, orange_counts) = create_counts(current_word_list)
         brute_force_q = input("Use brute force? (y/n):")
         use_brute_force = brute_force_q == 'y'
-        print("Remaining words:",len(current_word_list))
-        print("Required information:",get_entropy_of_words_remaining(current_word_list,frequency_dict)," bits")
+        print("Remaining words:",len(solver.candidate_indices))
+        print("Required information:",solver.entropy()," bits")
+        suggestions, info_scores = solver.suggest(5, brute_force=use_brute_force, n_processes=args.processes, exhaustive=args.exhaustive)
         if use_brute_force:
-            suggestions, info_scores = get_suggestions_brutish_force(initial_word_list, current_word_list, frequency_dict)
             print("Top suggested guesses and expected information they will provide (in bits):")
-            print(initial_word_list[suggestions][0:5])
-            print(info_scores[0:5])
+            print(suggestions)
+            print(info_scores)
         else:
-            suggestions, info_scores = get_suggestions(current_word_list, green_counts, orange_counts)
             print("Top suggested guesses:")
-            print(current_word_list[suggestions][0:5])
+            print(suggestions)
             print("Expected information they will provide (in bits):")
-            print(info_scores[0:5])
+            print(info_scores)
+        if use_brute_force and (args.lookahead is not None):
+            guess, value, depth = solver.lookahead(objective=args.objective, time_budget=args.lookahead)
+            print("Lookahead suggestion (searched", depth, "guesses ahead):", guess, "with", args.objective, value)
+        if use_brute_force and args.minimax:
+            minimax_words, largest = solver.minimax(5, n_processes=args.processes)
+            print("Top minimax guesses and the most words they could leave:")
+            print(minimax_words)
+            print(largest)
+            worst_case = solver.worst_case()
+            if worst_case is not None:
+                print("Guaranteed to win within", worst_case[1], "guesses starting with", worst_case[0])
         if use_word_frequencies == 'y':
-            candidate_words, probs = get_candidate_word_probs(current_word_list, frequency_dict)
+            candidate_words, probs = solver.candidates(5)
             print("Top candidate words and their probabilities:")
-            print(current_word_list[candidate_words[0:5]])
-            print(probs[0:5])
-        #other_suggestions, other_scores = get_suggestions(initial_word_list, green_counts, orange_counts)
-        #print(initial_word_list[other_suggestions][0:5])
-        #print(other_scores[0:5])
+            print(candidate_words)
+            print(probs)
         next_guess = input("Enter your guess here:")
         result = input("Enter the result here, -=grey, .=orange, *=green:")
-        current_word_list = update_word_list(current_word_list, next_guess, result)
-        if len(current_word_list) == 1:
-            print("I think I know the word: " + current_word_list[0])
-            break
\ No newline at end of file
+        solver.apply(next_guess, result)
+        if instrumentation.enabled:
+            print(instrumentation.format_turn(instrumentation.end_turn()))
+            instrumentation.write_trace()
+        if len(solver.candidate_indices) == 1:
+            print("I think I know the word: " + solver.current_word_list[0])
+            break
@@ -3,27 +3,90 @@
 Created on Tue Feb 22 20:59:58 2022
 
 @author: tobycrisford
+
+Grids are rendered from templates: everything about a grid except its
+letters only depends on its shape and colours, so that text is built once
+per colour pattern, with a %s for each letter, and cached. Rendering a grid
+is then one % substitution. VisDocument and VisArchive stream many grids
+into one HTML file or one zip of HTML files, each grid's text the same as
+create_vis would write for it.
 """
 
+from functools import lru_cache
+import zipfile
+
+COLOUR_NAMES = {"*": "green", ".": "orange"} #Anything else is grey
+DOCUMENT_HEAD = "<html>\n<body>\n"
+DOCUMENT_TAIL = "</body></html>\n"
+
+
+@lru_cache(maxsize=None)
+def get_cell_template(i, j, colour_name):
+    #The letter goes in the %s
+    return ('<rect x="' + str(j * 100 + 10) + '" y="' + str(i * 100 + 10) + '" width="80" height="80" style="fill:' + colour_name + '"/>\n'
+            + '<text x="' + str(j * 100 + 50) + '" y="' + str(i * 100 + 50) + '" text-anchor="middle" stroke="white" stroke-width="1px", fill="white" font-family="Arial">\n'
+            + '%s\n</text>\n')
+
+@lru_cache(maxsize=4096)
+def get_svg_template(width, colour_names):
+    """The svg element for a grid with these colours (names, row by row), with a %s per letter."""
+    n_rows = len(colour_names) // width
+    header = '<svg viewBox="0 0 ' + str(width * 250) + ' ' + str(n_rows * 250) + '" xmlns="http://www.w3.org/2000/svg">\n'
+    return header + "".join([get_cell_template(k // width, k % width, colour_names[k]) for k in range(len(colour_names))]) + "</svg>"
+
+def fill_svg_template(words, colours):
+    colour_names = tuple([COLOUR_NAMES.get(c, "grey") for row in colours for c in row[0:len(words[0])]])
+    return get_svg_template(len(words[0]), colour_names) % tuple([letter.upper() for word in words for letter in word])
+
+def render_svg(words, colours):
+    """Just the svg element of render_vis."""
+    return fill_svg_template(words, colours) + "\n"
+
+def render_vis(words, colours):
+    #The same text create_vis writes, for when the output is streamed rather than saved
+    return DOCUMENT_HEAD + fill_svg_template(words, colours) + DOCUMENT_TAIL
+
 def create_vis(words, colours, file_out):
-    
-    lines = ["<html>","<body>",'<svg viewBox="0 0 ' + str(len(words[0]) * 250) + ' ' + str(len(words) * 250) + '" xmlns="http://www.w3.org/2000/svg">']
-    for i in range(len(words)):
-        for j in range(len(words[i])):
-            rect_line = '<rect x="' + str(j * 100 + 10) + '" y="' + str(i * 100 + 10) + '" width="80" height="80" style="fill:'
-            if colours[i][j] == "*":
-                rect_line += "green"
-            elif colours[i][j] == ".":
-                rect_line += "orange"
-            else:
-                rect_line += "grey"
-            rect_line += '"/>'
-            lines.append(rect_line)
-            lines.append('<text x="' + str(j * 100 + 50) + '" y="' + str(i * 100 + 50) + '" text-anchor="middle" stroke="white" stroke-width="1px", fill="white" font-family="Arial">')
-            lines.append(words[i][j].upper())
-            lines.append('</text>')
-    lines.append("</svg></body></html>")
-    
+
     with open(file_out, "w") as f:
-        f.writelines([line + "\n" for line in lines])
-    
\ No newline at end of file
+        f.write(render_vis(words, colours))
+
+
+class VisDocument:
+    """One HTML file with a grid after another, written as they are added."""
+
+    def __init__(self, file_out):
+        self.file = open(file_out, "w")
+        self.file.write(DOCUMENT_HEAD)
+
+    def add(self, words, colours):
+        self.file.write(render_svg(words, colours))
+
+    def close(self):
+        self.file.write(DOCUMENT_TAIL)
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class VisArchive:
+    """A zip with create_vis's file for each grid, written as they are added."""
+
+    def __init__(self, file_out):
+        self.archive = zipfile.ZipFile(file_out, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def add(self, words, colours, name):
+        self.archive.writestr(name, render_vis(words, colours))
+
+    def close(self):
+        self.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()